@@ -0,0 +1,295 @@
+import argparse
+import glob
+import json
+import os
+import random
+import time
+import numpy as np
+from Utilities import calculate_route_cost, calculate_solution_cost
+from Local_Search import two_opt, local_search, create_candidate_lists
+from Guided_Local_Search import guided_local_search, apply_gls_penalty, update_gls_penalty
+from Construction import create_random_initial_solution
+from Main import parse_vrp_file, parse_sol_file, create_distance_matrix, load_distance_matrix, run_seed
+
+BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DEFAULT_RESULTS_PATH = os.path.join(BASE_PATH, "Resultados Benchmark.json")
+
+
+def reference_two_opt(route, distance_matrix, depot):
+    """Pairwise two-opt that rebuilds and re-costs every reversed route (the original O(n³) scheme)."""
+    best_route = route[:]
+    best_cost = calculate_route_cost(route, distance_matrix, depot)
+    n = len(route)
+
+    for i in range(1, n - 2):
+        for j in range(i + 1, n - 1):
+            new_route = route[:i] + route[i:j + 1][::-1] + route[j + 1:]
+            new_cost = calculate_route_cost(new_route, distance_matrix, depot)
+            if new_cost < best_cost:
+                best_route = new_route
+                best_cost = new_cost
+
+    return best_route
+
+def benchmark_two_opt(instance_name="F-n135-k7", instance_set="F", repeats=20, seed=0):
+    """
+    Times two_opt against reference_two_opt on the long routes of a CVRPLIB instance.
+
+    Parameters:
+    - instance_name (str): Name of the instance, without extension.
+    - instance_set (str): Letter of the "Set X" folder holding the instance.
+    - repeats (int): Number of calls timed for each route.
+    - seed (int): Seed of the shuffling used to create unoptimized routes.
+
+    Returns:
+    - results (list of tuples): (route length, reference seconds per call, vectorized seconds per call).
+    """
+    set_path = os.path.join(BASE_PATH, f"Set {instance_set}")
+    instance = parse_vrp_file(os.path.join(set_path, instance_set, f"{instance_name}.vrp"))
+    routes, _ = parse_sol_file(os.path.join(set_path, "Sol", f"{instance_name}.sol"))
+    distance_matrix = create_distance_matrix(instance)
+    depot = instance["depot"]
+
+    # The optimal routes have no improving reversal, so shuffle them to give two_opt real work
+    rng = random.Random(seed)
+    routes = sorted(routes, key=len, reverse=True)
+    routes = [rng.sample(route, len(route)) for route in routes]
+
+    results = []
+    for route in routes:
+        if reference_two_opt(route, distance_matrix, depot) != two_opt(route, distance_matrix, depot):
+            raise AssertionError(f"two_opt differs from the reference on a route of length {len(route)}")
+
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            reference_two_opt(route, distance_matrix, depot)
+        reference_time = (time.perf_counter() - start_time) / repeats
+
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            two_opt(route, distance_matrix, depot)
+        vectorized_time = (time.perf_counter() - start_time) / repeats
+
+        results.append((len(route), reference_time, vectorized_time))
+        print(f"Rota com {len(route):3d} clientes -> Referencia: {reference_time * 1000:9.3f} ms | "
+              f"Vetorizado: {vectorized_time * 1000:7.3f} ms | Speedup: {reference_time / vectorized_time:7.1f}x")
+    return results
+
+def benchmark_local_search(instance_name="F-n135-k7", instance_set="F", repeats=5, seed=0, granular_k=None):
+    """
+    Times local_search descending from seeded random initial solutions.
+
+    Parameters:
+    - instance_name (str), instance_set (str): See benchmark_two_opt.
+    - repeats (int): Number of descents timed.
+    - seed (int): Seed of the initial solutions.
+    - granular_k (int, optional): Size of the candidate lists (None for the full neighbourhoods).
+
+    Returns:
+    - seconds (float): Mean time of one descent.
+    """
+    instance = parse_vrp_file(os.path.join(BASE_PATH, f"Set {instance_set}", instance_set, f"{instance_name}.vrp"))
+    distance_matrix = create_distance_matrix(instance)
+    candidate_lists = create_candidate_lists(distance_matrix, granular_k) if granular_k else None
+    random.seed(seed)
+    initial_solutions = [create_random_initial_solution(instance) for _ in range(repeats)]
+
+    start_time = time.perf_counter()
+    for solution in initial_solutions:
+        local_search(solution, distance_matrix, instance, candidate_lists)
+    seconds = (time.perf_counter() - start_time) / repeats
+    print(f"local_search {instance_name} -> {seconds * 1000:.1f} ms por descida")
+    return seconds
+
+def benchmark_apply_gls_penalty(instance_name="F-n135-k7", instance_set="F", repeats=200, features_per_iteration=2, seed=0):
+    """
+    Times the full rebuild of the penalized matrix (apply_gls_penalty) against the in-place
+    update of the new features (update_gls_penalty) done at every GLS iteration.
+
+    Returns:
+    - (rebuild seconds, update seconds): Mean time of one call of each.
+    """
+    instance = parse_vrp_file(os.path.join(BASE_PATH, f"Set {instance_set}", instance_set, f"{instance_name}.vrp"))
+    distance_matrix = create_distance_matrix(instance)
+    penalties = np.zeros_like(distance_matrix, dtype=float)
+    penalyzed_distance_matrix = apply_gls_penalty(distance_matrix, penalties, 0.3, 1)
+    rng = random.Random(seed)
+    features = [[(rng.randint(2, instance["dimension"]), rng.randint(2, instance["dimension"])) for _ in range(features_per_iteration)]
+                for _ in range(repeats)]
+
+    start_time = time.perf_counter()
+    for iteration_features in features:
+        apply_gls_penalty(distance_matrix, penalties, 0.3, 1, out=penalyzed_distance_matrix)
+    rebuild_time = (time.perf_counter() - start_time) / repeats
+
+    start_time = time.perf_counter()
+    for iteration_features in features:
+        update_gls_penalty(penalyzed_distance_matrix, distance_matrix, penalties, iteration_features, 0.3, 1)
+    update_time = (time.perf_counter() - start_time) / repeats
+    print(f"apply_gls_penalty {instance_name} -> Reconstrucao: {rebuild_time * 1e6:.1f} us | Atualizacao: {update_time * 1e6:.1f} us")
+    return rebuild_time, update_time
+
+def bundled_instances():
+    """Paths (vrp, sol) of the bundled instances that have a reference solution, in name order."""
+    pairs = []
+    for vrp_path in sorted(glob.glob(os.path.join(BASE_PATH, "Set *", "*", "*.vrp"))):
+        name = os.path.splitext(os.path.basename(vrp_path))[0]
+        sol_path = os.path.join(os.path.dirname(os.path.dirname(vrp_path)), "Sol", f"{name}.sol")
+        if os.path.exists(sol_path):
+            pairs.append((vrp_path, sol_path))
+    return pairs
+
+def benchmark_instances(instances=None, time_limit=30, repetitions=1, target_gap=0.01, LAMBDA=0.3, Penalidade=1,
+                        granular_k=None, fast_gls=False, seed=0, output_path=DEFAULT_RESULTS_PATH):
+    """
+    Runs the GLS over instances with a reference solution and records how fast it gets close to it.
+
+    For every run it records the best-cost-vs-time curve (one point per improvement), the
+    time-to-target (first time the best cost is within target_gap of the reference cost),
+    the final gap and the GLS iteration rate, and writes everything to a JSON file. All of it is
+    read from the observer events of guided_local_search, so the times are those of the
+    solver's clock (started after the initial solution).
+
+    Parameters:
+    - instances (list of tuples, optional): (vrp path, sol path) pairs (default: bundled_instances()).
+    - time_limit (float): GLS time limit of each run, in seconds.
+    - repetitions (int): Runs of each instance, seeded with Main.run_seed.
+    - target_gap (float): Relative gap of the time-to-target (0.01 = within 1%).
+    - LAMBDA, Penalidade, granular_k, fast_gls: GLS settings, see Main.solve.
+    - seed (int): Base seed of the runs.
+    - output_path (str, optional): JSON file written with the results (None to skip).
+
+    Returns:
+    - results (dict): {"settings": ..., "runs": [...], "summary": {instance name: ...}}.
+    """
+    if instances is None:
+        instances = bundled_instances()
+    settings = {"time_limit": time_limit, "repetitions": repetitions, "target_gap": target_gap, "LAMBDA": LAMBDA,
+                "Penalidade": Penalidade, "granular_k": granular_k, "fast_gls": fast_gls, "seed": seed}
+    runs = []
+    for vrp_path, sol_path in instances:
+        instance = parse_vrp_file(vrp_path)
+        _, reference_cost = parse_sol_file(sol_path)
+        if reference_cost is None:
+            reference_cost = instance["optimal_value"]
+        distance_matrix = load_distance_matrix(instance)
+        candidate_lists = create_candidate_lists(distance_matrix, granular_k) if granular_k else None
+        target_cost = reference_cost * (1 + target_gap)
+
+        for repetition in range(repetitions):
+            random.seed(run_seed(seed, instance, repetition))
+            record = {"iterations": 0, "elapsed": 0.0, "curve": [], "time_to_target": None}
+
+            def observer(event):
+                # Read-only view of the run: elapsed is measured by the solver's own clock
+                record["iterations"] = event["iteration"]
+                record["elapsed"] = event["elapsed"]
+                if not record["curve"] or event["best_cost"] < record["curve"][-1][1]:
+                    record["curve"].append([round(event["elapsed"], 4), event["best_cost"]])
+                if record["time_to_target"] is None and event["best_cost"] <= target_cost:
+                    record["time_to_target"] = round(event["elapsed"], 4)
+
+            Best_Solution, _, _, _ = guided_local_search(instance, distance_matrix, LAMBDA, Penalidade, time_limit,
+                                                         candidate_lists, fast_gls, observers=[observer])
+            elapsed = record["elapsed"]
+            best_cost = float(calculate_solution_cost(Best_Solution, distance_matrix, instance["depot"]))
+            if record["time_to_target"] is None and best_cost <= target_cost:
+                # Reached by the final local search on the best solution
+                record["time_to_target"] = round(elapsed, 4)
+            runs.append({"instance": instance["name"], "repetition": repetition, "reference_cost": reference_cost,
+                         "best_cost": best_cost, "gap": (best_cost - reference_cost) / reference_cost,
+                         "time_to_target": record["time_to_target"], "iterations": record["iterations"],
+                         "elapsed": round(elapsed, 4), "iterations_per_second": record["iterations"] / elapsed if elapsed else 0.0,
+                         "curve": record["curve"]})
+            print(f"{instance['name']} #{repetition}: Custo {best_cost:.0f} | Gap {runs[-1]['gap']:.5f} | "
+                  f"Tempo ate o alvo {record['time_to_target']} | Iteracoes/s {runs[-1]['iterations_per_second']:.1f}")
+
+    results = {"settings": settings, "runs": runs, "summary": summarize_runs(runs)}
+    if output_path is not None:
+        with open(output_path, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=1)
+    return results
+
+def summarize_runs(runs):
+    """Per-instance means of the runs of benchmark_instances."""
+    summary = {}
+    for name in dict.fromkeys(run["instance"] for run in runs):
+        instance_runs = [run for run in runs if run["instance"] == name]
+        reached = [run["time_to_target"] for run in instance_runs if run["time_to_target"] is not None]
+        summary[name] = {"runs": len(instance_runs),
+                         "mean_gap": sum(run["gap"] for run in instance_runs) / len(instance_runs),
+                         "best_gap": min(run["gap"] for run in instance_runs),
+                         "target_rate": len(reached) / len(instance_runs),
+                         "mean_time_to_target": sum(reached) / len(reached) if reached else None,
+                         "mean_iterations_per_second": sum(run["iterations_per_second"] for run in instance_runs) / len(instance_runs)}
+    return summary
+
+def compare_benchmarks(results_path, baseline_path, gap_tolerance=0.005, time_tolerance=0.25, rate_tolerance=0.25):
+    """
+    Flags the instances where a benchmark result regressed against a stored baseline.
+
+    Parameters:
+    - results_path (str), baseline_path (str): JSON files written by benchmark_instances.
+    - gap_tolerance (float): Allowed increase of the mean gap (absolute).
+    - time_tolerance (float): Allowed relative increase of the mean time-to-target.
+    - rate_tolerance (float): Allowed relative drop of the iterations per second.
+
+    Returns:
+    - regressions (list of str): One message per regression (empty when nothing regressed).
+    """
+    with open(results_path, encoding="utf-8") as file:
+        current = json.load(file)["summary"]
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)["summary"]
+
+    regressions = []
+    for name, base in baseline.items():
+        if name not in current:
+            continue
+        now = current[name]
+        if now["mean_gap"] > base["mean_gap"] + gap_tolerance:
+            regressions.append(f"{name}: gap medio {base['mean_gap']:.5f} -> {now['mean_gap']:.5f}")
+        if now["target_rate"] < base["target_rate"]:
+            regressions.append(f"{name}: alvo atingido em {base['target_rate']:.0%} -> {now['target_rate']:.0%} das execucoes")
+        elif (base["mean_time_to_target"] is not None and now["mean_time_to_target"] is not None
+              and now["mean_time_to_target"] > base["mean_time_to_target"] * (1 + time_tolerance)):
+            regressions.append(f"{name}: tempo ate o alvo {base['mean_time_to_target']:.2f}s -> {now['mean_time_to_target']:.2f}s")
+        if now["mean_iterations_per_second"] < base["mean_iterations_per_second"] * (1 - rate_tolerance):
+            regressions.append(f"{name}: iteracoes/s {base['mean_iterations_per_second']:.1f} -> {now['mean_iterations_per_second']:.1f}")
+    for message in regressions:
+        print(f"REGRESSAO {message}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks of the GLS over the bundled CVRPLIB instances.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the GLS over the instances with a reference solution")
+    run_parser.add_argument("vrp_files", nargs="*", help="instances to run (default: every bundled instance with a .sol)")
+    run_parser.add_argument("--time-limit", type=float, default=30)
+    run_parser.add_argument("--repetitions", type=int, default=1)
+    run_parser.add_argument("--target-gap", type=float, default=0.01)
+    run_parser.add_argument("--lambda", dest="LAMBDA", type=float, default=0.3)
+    run_parser.add_argument("--penalidade", type=float, default=1)
+    run_parser.add_argument("--granular-k", type=int, default=None)
+    run_parser.add_argument("--fast-gls", action="store_true")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", default=DEFAULT_RESULTS_PATH)
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline result file")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("baseline")
+    commands.add_parser("micro", help="microbenchmarks of two_opt, local_search and apply_gls_penalty")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        instances = None
+        if args.vrp_files:
+            instances = [pair for pair in bundled_instances() if os.path.abspath(pair[0]) in map(os.path.abspath, args.vrp_files)]
+        benchmark_instances(instances, args.time_limit, args.repetitions, args.target_gap, args.LAMBDA, args.penalidade,
+                            args.granular_k, args.fast_gls, args.seed, args.output)
+    elif args.command == "compare":
+        raise SystemExit(1 if compare_benchmarks(args.results, args.baseline) else 0)
+    else:
+        benchmark_two_opt()
+        benchmark_local_search()
+        benchmark_apply_gls_penalty()
@@ -0,0 +1,88 @@
+import os
+import pickle
+import time
+from Guided_Local_Search import guided_local_search
+
+# Bumped whenever the layout of the saved state changes
+CHECKPOINT_VERSION = 1
+# Default seconds between two checkpoints of a run
+CHECKPOINT_INTERVAL = 60.0
+
+
+class Checkpointer:
+    """
+    Periodic checkpoints of a guided_local_search run (its checkpoint argument).
+
+    The search hands its whole state to save (penalties, current and best routes, iteration
+    counters, elapsed time and the state of the random module) at the end of an iteration once
+    interval seconds have passed since the last save, and once more when it stops. The file is
+    written under a temporary name and renamed, so a run killed while saving leaves the previous
+    checkpoint intact. resume_guided_local_search continues a run from it.
+    """
+
+    def __init__(self, path, interval=CHECKPOINT_INTERVAL):
+        """
+        Parameters:
+        - path (str): Checkpoint file (overwritten at every save).
+        - interval (float): Minimum seconds between two saves.
+        """
+        self.path = path
+        self.interval = interval
+        self.last_save = time.time()
+        self.saves = 0
+
+    def due(self):
+        """True when the interval since the last save has passed."""
+        return time.time() - self.last_save >= self.interval
+
+    def save(self, state):
+        """Writes the state atomically."""
+        state = dict(state, version=CHECKPOINT_VERSION)
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.path)
+        self.last_save = time.time()
+        self.saves += 1
+
+
+def load_checkpoint(path):
+    """
+    Reads a checkpoint written by Checkpointer.
+
+    Returns:
+    - state (dict): The saved state, for guided_local_search(resume_state=...). Its
+      "best_routes" can also warm-start another run (initial_solution=...).
+    """
+    with open(path, "rb") as file:
+        state = pickle.load(file)
+    if state.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is a checkpoint of version {state.get('version')}, expected {CHECKPOINT_VERSION}")
+    return state
+
+def resume_guided_local_search(Instance, distance_matrix, checkpoint_path, time_limit=300, interval=CHECKPOINT_INTERVAL,
+                               **kwargs):
+    """
+    Continues a checkpointed guided_local_search run, checkpointing it to the same file.
+
+    The search goes on from the saved penalties, solutions, counters and random state, with
+    LAMBDA and Penalidade of the checkpoint; time_limit counts the time spent before the
+    checkpoint too.
+
+    Parameters:
+    - Instance (dict), distance_matrix (2D array): The instance of the checkpointed run.
+    - checkpoint_path (str): Checkpoint file.
+    - time_limit (float): Total time limit of the run, in seconds.
+    - interval (float): Seconds between two checkpoints.
+    - kwargs: Other arguments of guided_local_search (candidate_lists, fast_gls, termination, ...).
+
+    Returns:
+    - The result of guided_local_search.
+    """
+    state = load_checkpoint(checkpoint_path)
+    if state["instance"] != Instance["name"]:
+        raise ValueError(f"{checkpoint_path} is a checkpoint of {state['instance']}, not of {Instance['name']}")
+    return guided_local_search(Instance, distance_matrix, state["LAMBDA"], state["Penalidade"], time_limit,
+                               checkpoint=Checkpointer(checkpoint_path, interval), resume_state=state, **kwargs)
@@ -0,0 +1,357 @@
+import heapq
+import math
+import random
+import numpy as np
+
+# Attempts of the randomized constructions before giving up on them
+MAX_CONSTRUCTION_ATTEMPTS = 1000
+# Best savings kept per customer by clarke_wright_savings (all of them up to SAVINGS_NEIGHBOURS + 1 customers)
+SAVINGS_NEIGHBOURS = 100
+# Rows of the savings computed at once, to bound the temporaries of large instances
+SAVINGS_BLOCK_ROWS = 512
+
+
+def create_random_initial_solution(Instance, distance_matrix=None):
+    """
+    Cria uma solução inicial aleatória, distribuindo clientes entre veículos.
+
+    Embaralha os clientes e aloca cada um ao primeiro veículo com capacidade suficiente,
+    repetindo o sorteio enquanto algum cliente ficar de fora. Depois de
+    MAX_CONSTRUCTION_ATTEMPTS sorteios sem sucesso usa randomized_first_fit_decreasing.
+    A instância não é alterada.
+
+    Parâmetros:
+    - Instance (dict): Dados da instância do problema, incluindo:
+      - num_vehicles: Número de veículos disponíveis.
+      - dimension: Número total de clientes (incluindo o depósito).
+      - demands: Lista de demandas dos clientes.
+      - capacity: Capacidade máxima de cada veículo.
+    - distance_matrix (2D array, opcional): Usada apenas pelo fallback.
+
+    Retorna:
+    - solution (list of lists): Solução inicial com clientes alocados aleatoriamente.
+    """
+    demands = Instance["demands"]
+    capacity = Instance["capacity"]
+    # Cria uma lista de clientes (excluindo o depósito, assumido como cliente 1)
+    remaining_customers = list(range(2, Instance["dimension"] + 1))
+
+    for _ in range(MAX_CONSTRUCTION_ATTEMPTS):
+        # Inicializa a solução com uma lista vazia para cada veículo
+        solution = [[] for _ in range(Instance["num_vehicles"])]
+        loads = [0] * Instance["num_vehicles"]
+
+        # Embaralha os clientes para distribuir aleatoriamente
+        random.shuffle(remaining_customers)
+        placed = 0
+        for customer in remaining_customers:
+            demand = demands[customer - 1]
+            # Tenta alocar o cliente a um veículo com capacidade suficiente
+            for vehicle in range(Instance["num_vehicles"]):
+                if loads[vehicle] + demand <= capacity:
+                    solution[vehicle].append(customer)
+                    loads[vehicle] += demand
+                    placed += 1
+                    break
+        if placed == len(remaining_customers):
+            return solution
+    return randomized_first_fit_decreasing(Instance, distance_matrix)
+
+
+def randomized_first_fit_decreasing(Instance, distance_matrix=None, noise=0.1):
+    """
+    Bin-packing construction: customers in decreasing order of demand go to the first vehicle
+    with room for them, then every route is ordered by nearest neighbour from the depot.
+
+    The first attempt sorts by demand with random tie-breaking. Each failed attempt scales the
+    demands by random factors in [1 - noise * attempt, 1 + noise * attempt] before sorting, so
+    the order drifts from the pure first-fit-decreasing one until a packing in num_vehicles
+    vehicles is found.
+
+    Parameters:
+    - Instance (dict): Parsed instance.
+    - distance_matrix (2D array, optional): Distances for the nearest-neighbour ordering
+      (without it the routes keep the packing order).
+    - noise (float): Growth of the perturbation of the demands per failed attempt.
+
+    Returns:
+    - solution (list of lists): One route per vehicle (possibly empty).
+
+    Raises:
+    - ValueError: If no packing is found in MAX_CONSTRUCTION_ATTEMPTS attempts.
+    """
+    demands = Instance["demands"]
+    capacity = Instance["capacity"]
+    num_vehicles = Instance["num_vehicles"]
+    customers = _customers(Instance)
+
+    for attempt in range(MAX_CONSTRUCTION_ATTEMPTS):
+        spread = min(noise * attempt, 1.0)
+        order = sorted(customers, key=lambda customer: (demands[customer - 1] * random.uniform(1 - spread, 1 + spread),
+                                                        random.random()), reverse=True)
+        solution = [[] for _ in range(num_vehicles)]
+        loads = [0] * num_vehicles
+        for customer in order:
+            demand = demands[customer - 1]
+            for vehicle in range(num_vehicles):
+                if loads[vehicle] + demand <= capacity:
+                    solution[vehicle].append(customer)
+                    loads[vehicle] += demand
+                    break
+            else:
+                break
+        else:
+            if distance_matrix is not None:
+                solution = [_nearest_neighbour_order(route, distance_matrix, Instance["depot"]) for route in solution]
+            return solution
+    raise ValueError(f"No packing of {Instance['name']} in {num_vehicles} vehicles found")
+
+
+def sweep(Instance, distance_matrix=None):
+    """
+    Sweep construction: customers sorted by polar angle around the depot, starting at a random
+    customer, fill the vehicles one after the other.
+
+    Falls back to randomized_first_fit_decreasing when the sweep needs more than num_vehicles
+    vehicles (tight instances).
+
+    Parameters:
+    - Instance (dict): Parsed instance (needs the coordinates).
+    - distance_matrix (2D array, optional): Used only by the fallback.
+
+    Returns:
+    - solution (list of lists): One route per vehicle (possibly empty).
+    """
+    if not len(Instance["coordinates"]):
+        raise ValueError(f"The sweep construction needs the coordinates of {Instance['name']}")
+    demands = Instance["demands"]
+    capacity = Instance["capacity"]
+    depot_x, depot_y = Instance["coordinates"][Instance["depot"] - 1]
+    customers = sorted(_customers(Instance), key=lambda customer: math.atan2(Instance["coordinates"][customer - 1][1] - depot_y,
+                                                                             Instance["coordinates"][customer - 1][0] - depot_x))
+    start = random.randrange(len(customers))
+    customers = customers[start:] + customers[:start]
+
+    routes = [[]]
+    load = 0
+    for customer in customers:
+        demand = demands[customer - 1]
+        if load + demand > capacity:
+            routes.append([])
+            load = 0
+        routes[-1].append(customer)
+        load += demand
+    return _fit_fleet(routes, Instance, distance_matrix)
+
+
+def clarke_wright_savings(Instance, distance_matrix, neighbours=SAVINGS_NEIGHBOURS):
+    """
+    Parallel Clarke-Wright savings construction.
+
+    Starts from one route per customer and merges the routes ending in i and j (reversing one of
+    them if needed) in decreasing order of the saving d(depot, i) + d(depot, j) - d(i, j), while
+    the load fits. The savings are consumed through a heap holding the best remaining saving of
+    each customer, so the heap has one entry per customer instead of one per pair. Each customer
+    keeps only its next `neighbours` savings: they are computed in blocks of SAVINGS_BLOCK_ROWS
+    rows and cut with argpartition, and the next ones of a customer are ranked again from its
+    row when it has used them up while still at the end of a route. The merges are those of the
+    full savings matrix, in O(n * neighbours) memory instead of O(n²), and a packed
+    Distance_Matrix.TriangularDistanceMatrix is read through submatrix without being expanded.
+    Merges with a non-positive saving are only made while there are more routes than vehicles;
+    if that is still the case at the end, the construction falls back to
+    randomized_first_fit_decreasing.
+
+    Parameters:
+    - Instance (dict): Parsed instance.
+    - distance_matrix (2D array or TriangularDistanceMatrix): Distance matrix of the instance (symmetric).
+    - neighbours (int): Savings kept per customer at a time.
+
+    Returns:
+    - solution (list of lists): One route per vehicle (possibly empty).
+    """
+    demands = Instance["demands"]
+    capacity = Instance["capacity"]
+    num_vehicles = Instance["num_vehicles"]
+    depot = Instance["depot"]
+    customers = np.array(_customers(Instance))
+    keep = max(1, neighbours)
+    from_depot = _distance_block(distance_matrix, np.array([depot]), customers)[0]
+    savings, ranking = _best_savings(distance_matrix, customers, from_depot, keep)
+    # Whether every customer is at an end of its route: a customer inside a route is never merged again
+    at_end = np.ones(len(customers), dtype=bool)
+
+    # Route of every customer (by position in customers) and the routes by id
+    route_of = list(range(len(customers)))
+    routes = {index: [index] for index in range(len(customers))}
+    loads = {index: demands[customers[index] - 1] for index in range(len(customers))}
+
+    heap = [(-savings[i][0], i, 0) for i in range(len(customers)) if ranking[i]]
+    heapq.heapify(heap)
+    while heap and len(routes) > 1:
+        negative_saving, i, rank = heapq.heappop(heap)
+        saving = -negative_saving
+        if saving <= 0 and len(routes) <= num_vehicles:
+            break
+        if not at_end[i]:
+            # Its remaining savings can no longer be used
+            continue
+        j = ranking[i][rank]
+        if rank + 1 < len(ranking[i]):
+            heapq.heappush(heap, (-savings[i][rank + 1], i, rank + 1))
+        else:
+            # Used up: rank the next savings of i (twice as many), with the partners still at a route end
+            savings[i], ranking[i] = _next_savings(distance_matrix, customers, from_depot, i, saving, j, at_end,
+                                                   max(keep, 2 * len(ranking[i])))
+            if ranking[i]:
+                heapq.heappush(heap, (-savings[i][0], i, 0))
+        if not at_end[j]:
+            continue
+
+        route_i, route_j = route_of[i], route_of[j]
+        if route_i == route_j or loads[route_i] + loads[route_j] > capacity:
+            continue
+        first, second = routes[route_i], routes[route_j]
+        if first[-1] == i and second[0] == j:
+            merged = first + second
+        elif first[0] == i and second[-1] == j:
+            merged = second + first
+        elif first[-1] == i and second[-1] == j:
+            merged = first + second[::-1]
+        elif first[0] == i and second[0] == j:
+            merged = first[::-1] + second
+        else:
+            continue
+        # Keep the id of the longer route, relabel the customers of the shorter one
+        kept, absorbed = (route_i, route_j) if len(first) >= len(second) else (route_j, route_i)
+        for customer in routes[absorbed]:
+            route_of[customer] = kept
+        routes[kept] = merged
+        loads[kept] += loads.pop(absorbed)
+        del routes[absorbed]
+        at_end[i] = at_end[j] = False
+        at_end[merged[0]] = at_end[merged[-1]] = True
+
+    solution = [[int(customers[index]) for index in route] for route in routes.values()]
+    return _fit_fleet(solution, Instance, distance_matrix)
+
+
+# Construction methods selectable by name (guided_local_search(construction=...))
+CONSTRUCTION_METHODS = {"random": create_random_initial_solution,
+                        "savings": clarke_wright_savings,
+                        "sweep": sweep,
+                        "ffd": randomized_first_fit_decreasing}
+
+
+def create_initial_solution(Instance, distance_matrix, method="random"):
+    """
+    Builds an initial solution with one of the CONSTRUCTION_METHODS.
+
+    Parameters:
+    - Instance (dict): Parsed instance (not modified).
+    - distance_matrix (2D array): Distance matrix of the instance.
+    - method (str): "random", "savings" (Clarke-Wright), "sweep" or "ffd" (randomized first-fit decreasing).
+
+    Returns:
+    - solution (list of lists): One route per vehicle (possibly empty).
+    """
+    if method not in CONSTRUCTION_METHODS:
+        raise ValueError(f"Unknown construction method {method!r}, expected one of {sorted(CONSTRUCTION_METHODS)}")
+    return CONSTRUCTION_METHODS[method](Instance, distance_matrix)
+
+
+def warm_start_solution(Instance, routes):
+    """
+    Checks a given solution for warm-starting the search and pads it with empty routes up to
+    num_vehicles.
+
+    Parameters:
+    - Instance (dict): Parsed instance.
+    - routes (iterable of lists): Routes of the solution with 1-based node numbers, e.g. from
+      Main.parse_sol_file or a previous Best_Solution.
+
+    Returns:
+    - solution (list of lists): One route per vehicle (possibly empty).
+
+    Raises:
+    - ValueError: If the routes do not visit every customer once, overload a vehicle or need
+      more than num_vehicles vehicles.
+    """
+    routes = [list(route) for route in routes if len(route)]
+    visited = sorted(customer for route in routes for customer in route)
+    if visited != _customers(Instance):
+        raise ValueError(f"The warm-start solution does not visit every customer of {Instance['name']} exactly once")
+    for route in routes:
+        if sum(Instance["demands"][customer - 1] for customer in route) > Instance["capacity"]:
+            raise ValueError(f"A route of the warm-start solution exceeds the capacity of {Instance['name']}")
+    if len(routes) > Instance["num_vehicles"]:
+        raise ValueError(f"The warm-start solution uses {len(routes)} vehicles, {Instance['name']} has {Instance['num_vehicles']}")
+    return routes + [[] for _ in range(Instance["num_vehicles"] - len(routes))]
+
+
+def _best_savings(distance_matrix, customers, from_depot, keep):
+    """
+    The keep best savings of every customer, best first (ties by position, the order of a stable sort).
+
+    Returns:
+    - savings (list of lists): savings[i][r] is the r-th best saving of customers[i].
+    - ranking (list of lists): ranking[i][r] is the position in customers of its partner.
+    """
+    count = len(customers)
+    savings = []
+    ranking = []
+    for start in range(0, count, SAVINGS_BLOCK_ROWS):
+        stop = min(start + SAVINGS_BLOCK_ROWS, count)
+        block = from_depot[start:stop, None] + from_depot[None, :] - _distance_block(distance_matrix, customers[start:stop], customers)
+        block[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        if keep < count - 1:
+            best = np.argpartition(-block, keep - 1, axis=1)[:, :keep]
+        else:
+            best = np.broadcast_to(np.arange(count), block.shape)
+        best_savings = np.take_along_axis(block, best, axis=1)
+        order = np.lexsort((best, -best_savings), axis=1)
+        # The diagonal, last, is never kept
+        length = min(keep, count - 1)
+        savings.extend(np.take_along_axis(best_savings, order, axis=1)[:, :length].tolist())
+        ranking.extend(np.take_along_axis(best, order, axis=1)[:, :length].tolist())
+    return savings, ranking
+
+def _next_savings(distance_matrix, customers, from_depot, i, last_saving, last_partner, at_end, keep):
+    """
+    The keep best savings of customers[i] after (last_saving, last_partner) in the order of
+    _best_savings, only with the partners at a route end (the others can no longer be merged).
+    """
+    row = from_depot[i] + from_depot - _distance_block(distance_matrix, customers[i:i + 1], customers)[0]
+    positions = np.arange(len(customers))
+    candidates = np.flatnonzero(at_end & (positions != i)
+                                & ((row < last_saving) | ((row == last_saving) & (positions > last_partner))))
+    if len(candidates) > keep:
+        candidates = candidates[np.argpartition(-row[candidates], keep - 1)[:keep]]
+    order = np.lexsort((candidates, -row[candidates]))
+    return row[candidates[order]].tolist(), candidates[order].tolist()
+
+def _distance_block(distance_matrix, rows, columns):
+    """Dense distances from the nodes rows to the nodes columns, without expanding a packed matrix."""
+    if hasattr(distance_matrix, "submatrix"):
+        return np.asarray(distance_matrix.submatrix(rows, columns), dtype=float)
+    return np.asarray(distance_matrix[rows[:, None], columns[None, :]], dtype=float)
+
+def _customers(Instance):
+    """Customers of an instance (every node but the depot)."""
+    return [node for node in range(1, Instance["dimension"] + 1) if node != Instance["depot"]]
+
+def _fit_fleet(routes, Instance, distance_matrix):
+    """Pads the routes with empty ones up to num_vehicles, or falls back to first-fit decreasing if there are too many."""
+    if len(routes) > Instance["num_vehicles"]:
+        return randomized_first_fit_decreasing(Instance, distance_matrix)
+    return routes + [[] for _ in range(Instance["num_vehicles"] - len(routes))]
+
+def _nearest_neighbour_order(route, distance_matrix, depot):
+    """Orders the customers of a route by nearest neighbour, starting from the depot."""
+    remaining = set(route)
+    ordered = []
+    current = depot
+    while remaining:
+        current = min(remaining, key=lambda customer: distance_matrix[current][customer])
+        ordered.append(current)
+        remaining.remove(current)
+    return ordered
@@ -0,0 +1,98 @@
+import math
+import numpy as np
+
+
+class TriangularDistanceMatrix:
+    """
+    Symmetric distance matrix stored as its packed lower triangle (about half the memory of the
+    dense matrix, a quarter with an int32 dtype instead of float64).
+
+    values holds the rows 0..n of the lower triangle one after the other: row i (j <= i) starts
+    at i * (i + 1) // 2. matrix[i][j] reads a zero-copy memoryview of the row of max(i, j)
+    through a light row object, so it returns Python scalars; submatrix (used by two_opt) reads
+    blocks without expanding the matrix, while tolist and np.asarray expand it to the dense matrix.
+
+    Only the sparse-penalty mode of guided_local_search (LazyPenalizedMatrix, from
+    SPARSE_PENALTY_DIMENSION nodes on) keeps the matrix packed for the whole search; the dense
+    mode builds a dense penalized matrix from it, so the compact storage saves no memory there.
+    """
+
+    def __init__(self, values):
+        """
+        Parameters:
+        - values (1D array): Packed lower triangle, e.g. from pack or a memmap of the cache.
+        """
+        self.values = values
+        self.dimension = (math.isqrt(8 * len(values) + 1) - 1) // 2
+        offsets = np.arange(self.dimension + 1) * np.arange(1, self.dimension + 2) // 2
+        flat = memoryview(np.ascontiguousarray(values))
+        self.lower_rows = [flat[offsets[i]:offsets[i + 1]] for i in range(self.dimension)]
+        self.rows = [_TriangularRow(self.lower_rows, i) for i in range(self.dimension)]
+
+    @classmethod
+    def pack(cls, distance_matrix, dtype=None):
+        """Packs the lower triangle of a dense symmetric matrix."""
+        distance_matrix = np.asarray(distance_matrix)
+        rows, columns = np.tril_indices(len(distance_matrix))
+        return cls(distance_matrix[rows, columns].astype(dtype or distance_matrix.dtype))
+
+    def __getitem__(self, i):
+        return self.rows[i]
+
+    def __len__(self):
+        return self.dimension
+
+    @property
+    def shape(self):
+        return (self.dimension, self.dimension)
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    def submatrix(self, nodes, columns=None):
+        """Dense distances between the given nodes (indexed by position in nodes), or from nodes to columns."""
+        nodes = np.asarray(nodes, dtype=np.int64)
+        columns = nodes if columns is None else np.asarray(columns, dtype=np.int64)
+        high = np.maximum(nodes[:, None], columns[None, :])
+        low = np.minimum(nodes[:, None], columns[None, :])
+        return np.asarray(self.values)[high * (high + 1) // 2 + low]
+
+    def to_dense(self, dtype=None):
+        """The full (dimension x dimension) matrix."""
+        dense = np.zeros((self.dimension, self.dimension), dtype=dtype or self.values.dtype)
+        rows, columns = np.tril_indices(self.dimension)
+        dense[rows, columns] = self.values
+        dense[columns, rows] = self.values
+        return dense
+
+    def tolist(self):
+        return self.to_dense().tolist()
+
+    def __array__(self, dtype=None, copy=None):
+        return self.to_dense(dtype)
+
+
+class _TriangularRow:
+    """Row i of a TriangularDistanceMatrix, for matrix[i][j] reads."""
+    __slots__ = ("lower_rows", "i")
+
+    def __init__(self, lower_rows, i):
+        self.lower_rows = lower_rows
+        self.i = i
+
+    def __getitem__(self, j):
+        if j <= self.i:
+            return self.lower_rows[self.i][j]
+        return self.lower_rows[j][self.i]
+
+
+def open_distance_matrix(path):
+    """
+    Opens a distance matrix saved with np.save as a read-only memmap: a 2D file is a dense
+    matrix, a 1D file the packed lower triangle of a TriangularDistanceMatrix.
+    """
+    values = np.load(path, mmap_mode="r")
+    if values.ndim == 1:
+        return TriangularDistanceMatrix(values)
+    return values
@@ -1,49 +1,17 @@
 import numpy as np
-import time
-import copy
-from Utilities import calculate_solution_cost, calculate_custumer_number
-from Local_Search import local_search
 import random
+import time
+from collections import Counter, OrderedDict, defaultdict
+from Utilities import calculate_solution_cost
+from Local_Search import local_search, create_candidate_sets, TwoOptMemo, TWO_OPT_MEMO_SIZE
+from Termination import TIME_LIMIT
+from Construction import create_initial_solution, warm_start_solution
+from Solution import Solution
 
-def create_random_initial_solution(Instance):
-    """
-    Cria uma solução inicial aleatória, distribuindo clientes entre veículos.
-
-    Parâmetros:
-    - Instance (dict): Dados da instância do problema, incluindo:
-      - num_vehicles: Número de veículos disponíveis.
-      - dimension: Número total de clientes (incluindo o depósito).
-      - demands: Lista de demandas dos clientes.
-      - capacity: Capacidade máxima de cada veículo.
-
-    Retorna:
-    - solution (list of lists): Solução inicial com clientes alocados aleatoriamente.
-    """
-    for vehicle in range(Instance["num_vehicles"]):
-        Instance["vehicle_capacity"][vehicle] = 0
-    # Inicializa a solução com uma lista vazia para cada veículo
-    solution = [[] for _ in range(Instance["num_vehicles"])]
-
-    # Cria uma lista de clientes (excluindo o depósito, assumido como cliente 1)
-    remaining_customers = list(range(2, Instance["dimension"] + 1))
-
-    # Embaralha os clientes para distribuir aleatoriamente
-    random.shuffle(remaining_customers)
-    # Distribui os clientes aleatoriamente entre os veículos
-    for customer in remaining_customers:
-        demand = Instance["demands"][customer - 1]
-        #print(f"Cliente : {customer} - Demanda : {demand}")
-        # Tenta alocar o cliente a um veículo com capacidade suficiente
-        for vehicle in range(Instance["num_vehicles"]):
-            if Instance["vehicle_capacity"][vehicle] + demand <= Instance["capacity"]:
-                solution[vehicle].append(customer)
-                Instance["vehicle_capacity"][vehicle] += demand
-
-                break
-    if calculate_custumer_number(solution) != Instance["dimension"]:
-        solution = create_random_initial_solution(Instance)
-    return solution
-
+# Instances from this dimension on keep the penalties sparse (see LazyPenalizedMatrix)
+SPARSE_PENALTY_DIMENSION = 1000
+# Local optima remembered by a LocalOptimumMemo
+LOCAL_OPTIMUM_MEMO_SIZE = 16384
 
 def choose_penalty_features(solution, penalty_matrix, cost_matrix):
     """
@@ -76,62 +44,441 @@ def choose_penalty_features(solution, penalty_matrix, cost_matrix):
     return features_to_penalize
 
 
-def apply_gls_penalty(distance_matrix, penalty_matrix, lambda_value, Penalidade):
+def apply_gls_penalty(distance_matrix, penalty_matrix, lambda_value, Penalidade, out=None):
     """
-    Applies the GLS penalty to the distance matrix.
+    Applies the GLS penalty to the whole distance matrix (vectorized full rebuild).
+
+    Use it when the penalized matrix is created or when lambda_value or Penalidade
+    change; between iterations update_gls_penalty only touches the new features.
 
     Parameters:
     - distance_matrix (2D array): Original distance matrix.
     - penalty_matrix (2D array): Penalty matrix.
     - lambda_value (float): Weight of the penalty.
+    - Penalidade (float): Cost of one penalty unit.
+    - out (2D array, optional): Matrix rebuilt in place instead of allocating a new one.
 
     Returns:
     - new_distance_matrix (2D array): Modified distance matrix with penalties applied.
     """
-    new_distance_matrix = np.copy(distance_matrix)
-    for i in range(len(distance_matrix)):
-        for j in range(len(distance_matrix[i])):
-            new_distance_matrix[i][j] = distance_matrix[i][j] + lambda_value * Penalidade * penalty_matrix[i][j]
-    return new_distance_matrix
+    if out is None:
+        out = np.empty((len(distance_matrix), len(distance_matrix)), dtype=float)
+    np.multiply(penalty_matrix, lambda_value * Penalidade, out=out)
+    out += distance_matrix
+    return out
+
+
+def update_gls_penalty(penalyzed_distance_matrix, distance_matrix, penalty_matrix, features, lambda_value, Penalidade,
+                       penalyzed_cost_lists=None):
+    """
+    Updates the penalized distance matrix in place for the newly penalized features.
+
+    Parameters:
+    - penalyzed_distance_matrix (2D array): Penalized matrix kept across iterations.
+    - distance_matrix (2D array): Original distance matrix.
+    - penalty_matrix (2D array): Penalty matrix, already incremented for the features.
+    - features (list of tuples): Features (i, j) whose penalty changed.
+    - lambda_value (float): Weight of the penalty.
+    - Penalidade (float): Cost of one penalty unit.
+    - penalyzed_cost_lists (list of lists, optional): Nested-list copy of the penalized matrix
+      (given to local_search as its cost_matrix), updated alongside it.
+
+    Returns:
+    - penalyzed_distance_matrix (2D array): The same matrix, updated.
+    """
+    weight = lambda_value * Penalidade
+    for (i, j) in features:
+        penalyzed_distance_matrix[i][j] = distance_matrix[i][j] + weight * penalty_matrix[i][j]
+        if penalyzed_cost_lists is not None:
+            penalyzed_cost_lists[i][j] = float(penalyzed_distance_matrix[i][j])
+    return penalyzed_distance_matrix
+
+class LazyPenalizedMatrix(list):
+    """
+    Penalized distance matrix computed on the fly from the original matrix and sparse penalties.
+
+    The penalties are a defaultdict(Counter) (penalties[i][j] is the number of times the edge
+    (i, j) was penalized), so the memory is O(n + penalized edges) on top of the original matrix,
+    instead of the dense penalty and penalized matrices. matrix[i][j] reads like a 2D array: the
+    list holds a zero-copy memoryview of each row of the original matrix (indexing it returns
+    Python scalars), replaced by a _PenalizedRow, which adds weight * penalties[i][j], once
+    row i has penalties. Call refresh_rows after penalizing new features. Scalar reads of the
+    penalized rows are slower than the nested lists local_search builds from a dense matrix;
+    this is the mode for large instances.
+    """
+
+    def __init__(self, distance_matrix, penalties=None, weight=0.0):
+        """
+        Parameters:
+        - distance_matrix (2D array or Distance_Matrix.TriangularDistanceMatrix): Original
+          distance matrix (e.g. a read-only memmap).
+        - penalties (defaultdict(Counter)): Sparse penalties, None for the original matrix.
+        - weight (float): Cost of one penalty (lambda_value * Penalidade).
+        """
+        if hasattr(distance_matrix, "submatrix"):
+            # Compact storage, read through its own row objects
+            self.distance_matrix = distance_matrix
+            super().__init__(distance_matrix[i] for i in range(len(distance_matrix)))
+        else:
+            self.distance_matrix = np.ascontiguousarray(distance_matrix)
+            super().__init__(memoryview(row) for row in self.distance_matrix)
+        self.penalties = penalties if penalties is not None else defaultdict(Counter)
+        self.weight = weight
+        self.refresh_rows([(i, None) for i in self.penalties])
+
+    def refresh_rows(self, features):
+        """Switches the rows of the given features (i, j) to their penalized version."""
+        for (i, _) in features:
+            if not isinstance(self[i], _PenalizedRow) and self.penalties.get(i):
+                self[i] = _PenalizedRow(self[i], self.penalties[i], self.weight)
+
+    def submatrix(self, nodes):
+        """Dense penalized costs between the given nodes (indexed by position in nodes)."""
+        if hasattr(self.distance_matrix, "submatrix"):
+            submatrix = self.distance_matrix.submatrix(nodes).astype(float)
+        else:
+            submatrix = self.distance_matrix[np.ix_(nodes, nodes)].astype(float)
+        position = {node: index for index, node in enumerate(nodes)}
+        for index, node in enumerate(nodes):
+            for other, count in self.penalties.get(node, {}).items():
+                if other in position:
+                    submatrix[index, position[other]] += self.weight * count
+        return submatrix
+
+
+class _PenalizedRow:
+    """Row i of a LazyPenalizedMatrix that has penalized edges."""
+    __slots__ = ("row", "penalty_row", "weight")
+
+    def __init__(self, row, penalty_row, weight):
+        self.row = row
+        self.penalty_row = penalty_row
+        self.weight = weight
+
+    def __getitem__(self, j):
+        return self.row[j] + self.weight * self.penalty_row[j]
+
+
+class LocalOptimumMemo:
+    """
+    LRU memo of the local optima reached by the local searches of a GLS run, with their
+    revisit statistics.
+
+    A solution is keyed by the hash of its set of routes (independent of the order of the
+    vehicles, empty routes left out) and stored with the version of the penalties it was
+    recorded at; penalize bumps the version and stamps the features penalized with it. GLS
+    penalties only grow, so when the search comes back to a recorded optimum every move that
+    removes only edges not penalized since is still non-improving: only the endpoints of the
+    edges penalized since need to be checked (customers_to_recheck).
+    """
+
+    def __init__(self, dimension, maxsize=LOCAL_OPTIMUM_MEMO_SIZE):
+        """
+        Parameters:
+        - dimension (int): Number of nodes of the instance.
+        - maxsize (int): Number of local optima kept (least recently used first out).
+        """
+        self.maxsize = maxsize
+        self.version = 0
+        # penalized_at[i][j]: version of the last penalty of the edge (i, j)
+        self.penalized_at = [{} for _ in range(dimension + 1)]
+        self.entries = OrderedDict()
+        self.landings = 0
+        self.revisits = 0
+        self.rechecks = 0
+        self.certified = 0
+        self.most_visits = 0
+
+    @staticmethod
+    def solution_key(routes):
+        """Order-independent hash of the routes of a solution."""
+        return hash(frozenset(tuple(route) for route in routes if route))
+
+    def penalize(self, features):
+        """Stamps the edges penalized by a GLS iteration."""
+        self.version += 1
+        for (i, j) in features:
+            self.penalized_at[i][j] = self.version
+
+    def record(self, routes):
+        """Records the local optimum a local search landed on (a revisit if it is already known)."""
+        key = self.solution_key(routes)
+        self.landings += 1
+        visits = 1
+        if key in self.entries:
+            self.revisits += 1
+            visits += self.entries[key][1]
+            self.entries.move_to_end(key)
+        self.entries[key] = (self.version, visits)
+        self.most_visits = max(self.most_visits, visits)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def customers_to_recheck(self, routes):
+        """
+        Returns:
+        - set: For a recorded optimum, the endpoints of its edges penalized since it was
+          recorded (empty: still a local optimum); None for an unknown solution.
+        """
+        entry = self.entries.get(self.solution_key(routes))
+        if entry is None:
+            return None
+        version = entry[0]
+        penalized_at = self.penalized_at
+        recheck = set()
+        for route in routes:
+            # Features are inner customer edges, never depot edges
+            for i, j in zip(route, route[1:]):
+                if penalized_at[i].get(j, 0) > version:
+                    recheck.add(i)
+                    recheck.add(j)
+        self.rechecks += 1
+        if not recheck:
+            self.certified += 1
+        return recheck
+
+    def summary(self):
+        """Revisit statistics of the run as a dict."""
+        return {"landings": self.landings,
+                "distinct": self.landings - self.revisits,
+                "revisits": self.revisits,
+                "revisit_rate": self.revisits / self.landings if self.landings else 0.0,
+                "most_visits": self.most_visits,
+                "rechecks": self.rechecks,
+                "certified": self.certified}
+
+
+def notify_observers(observers, iteration, elapsed, cost, best_cost, features):
+    """Builds the event of one GLS iteration and passes it to every observer."""
+    event = {"iteration": iteration,
+             "elapsed": elapsed,
+             "cost": float(cost),
+             "best_cost": float(best_cost),
+             "features": [[int(i), int(j)] for (i, j) in features]}
+    for observer in observers:
+        observer(event)
 
 # Guided Local Search method
-def guided_local_search(Instance, distance_matrix, LAMBDA, Penalidade, time_limit=300):
+def guided_local_search(Instance, distance_matrix, LAMBDA, Penalidade, time_limit=300, candidate_lists=None, fast_gls=False, sync=None,
+                        profile=None, observers=None, termination=None, construction="random", sparse_penalties=None,
+                        two_opt_memo_size=TWO_OPT_MEMO_SIZE, optimum_memo_size=LOCAL_OPTIMUM_MEMO_SIZE, initial_solution=None,
+                        checkpoint=None, resume_state=None):
+    """
+    Perform Guided Local Search (GLS) to solve the CVRP.
+
+    candidate_lists (from Local_Search.create_candidate_lists) switches every local
+    search to the granular neighbourhood.
+
+    fast_gls runs the local search of each iteration with don't-look bits: only the
+    endpoints of the newly penalized features start active, and the activation spreads
+    to the customers touched by the applied moves.
+
+    sync is called at the end of every iteration as
+    sync(solution, Best_Solution, Best_Cost, penalties, penalyzed_distance_matrix, penalyzed_cost_lists);
+    it may change the penalties and the penalized matrix in place (then keeping
+    penalyzed_cost_lists, the nested-list copy the local searches read, in step with the matrix;
+    None with sparse penalties), and when it returns a solution the search continues from it
+    (used by the island model of Parallel_Guided_Local_Search).
+
+    profile (a Profiling.SearchProfile) collects the iteration count and rate, the time of
+    every phase and, through local_search, the per-operator counters.
+
+    observers (list of callables) are called once after the initial local search and once per
+    iteration with an event dict: iteration, elapsed (seconds), cost and best_cost (on the
+    original matrix) and features (the [i, j] pairs penalized in the iteration, empty for the
+    initial event). Trace.TraceWriter streams these events to a JSONL file.
+
+    termination (a Termination.Termination) adds stopping criteria to time_limit: target
+    cost or gap, maximum iterations, stagnation and an external stop signal.
+
+    construction names the method of Construction.create_initial_solution building the
+    initial solution ("random", "savings", "sweep" or "ffd").
+
+    sparse_penalties keeps the penalties in a defaultdict(Counter) read through a
+    LazyPenalizedMatrix instead of dense (n+1)² penalty and penalized matrices; None (the
+    default) enables it from SPARSE_PENALTY_DIMENSION nodes on. The search is the same, the
+    scalar cost reads are slower. penalties and penalyzed_distance_matrix given to sync are
+    then the sparse store and the lazy matrix. It is also the only mode in which a
+    Distance_Matrix.TriangularDistanceMatrix stays packed: the dense mode expands it.
+
+    two_opt_memo_size bounds the Local_Search.TwoOptMemo shared by the local searches over
+    the penalized matrix (0 disables it). The memo learns of the penalties through the
+    features penalized here, so a sync hook that changes the penalties itself must run with
+    two_opt_memo_size=0.
+
+    optimum_memo_size bounds the LocalOptimumMemo of the run (0 disables it): coming back to a
+    known local optimum, the local search only rechecks the customers next to the edges
+    penalized since. It assumes penalties never decrease (so, like the two-opt memo, it must be
+    disabled for a sync hook that changes them); its revisit statistics end up in the profile.
+
+    initial_solution (list of routes, e.g. from Main.parse_sol_file, a previous Best_Solution or
+    the "best_routes" of a checkpoint) warm-starts the search instead of construction.
+
+    checkpoint (a Checkpoint.Checkpointer) periodically saves the state of the search, and
+    resume_state (a state it saved, from Checkpoint.load_checkpoint) continues the search from
+    it: penalties (in the storage they were saved in, whatever sparse_penalties), current and
+    best solutions, counters, elapsed time (time_limit counts it) and random state. The memos
+    start empty, so the resumed search can break ties between equal moves differently.
+
+    Returns:
+    - Best_Solution (Solution), time_best (float), Iteration_best (int): Best solution found,
+      and the time and iteration it was found at.
+    - stop_reason (str): Criterion that stopped the search, one of the constants of Termination.
+    """
     Iterations = 0
-    """Perform Guided Local Search (GLS) to solve the CVRP.""" 
-
-    penalyzed_distance_matrix = np.copy(distance_matrix)
-
-    penalties = np.zeros_like(penalyzed_distance_matrix)
-
-    # Create the initial solution
-    initial_solution = create_random_initial_solution(Instance)
-    solution = local_search(initial_solution, penalyzed_distance_matrix, Instance)
-    Best_Cost = calculate_solution_cost(solution, distance_matrix, Instance["depot"])
-    Best_Solution = copy.deepcopy(solution)
-    start_time = time.time()
-    time_best = 0
-    Iteration_best = 0
-    # Run GLS until the time limit is reached
-    while time.time() - start_time < time_limit:
+    if profile is not None:
+        profile.lap(None)
+
+    if resume_state is not None:
+        sparse_penalties = not isinstance(resume_state["penalties"], np.ndarray)
+    elif sparse_penalties is None:
+        sparse_penalties = Instance["dimension"] >= SPARSE_PENALTY_DIMENSION
+    if sparse_penalties:
+        # Penalized costs computed on the fly, the only n² structure is the original matrix
+        penalties = defaultdict(Counter) if resume_state is None else resume_state["penalties"]
+        penalyzed_distance_matrix = LazyPenalizedMatrix(distance_matrix, penalties, LAMBDA * Penalidade)
+        # Already indexed like nested lists
+        penalyzed_cost_lists = None
+        final_distance_matrix = LazyPenalizedMatrix(distance_matrix)
+    else:
+        penalties = np.zeros((len(distance_matrix), len(distance_matrix)), dtype=float) if resume_state is None else resume_state["penalties"]
+        # Long-lived penalized matrix, updated in place as features are penalized
+        penalyzed_distance_matrix = apply_gls_penalty(distance_matrix, penalties, LAMBDA, Penalidade)
+        # Its nested-list copy for the scalar reads of the local searches, converted once and updated with it
+        penalyzed_cost_lists = penalyzed_distance_matrix.tolist()
+        final_distance_matrix = distance_matrix
+
+    # Membership tests of the granular moves, the candidate lists are fixed for the run
+    candidate_sets = create_candidate_sets(candidate_lists) if candidate_lists is not None else None
+    # two_opt results of the routes untouched by the new penalties, across iterations
+    two_opt_memo = TwoOptMemo(Instance["dimension"], two_opt_memo_size) if two_opt_memo_size else None
+    # Local optima already visited, with the penalties of their edges at the time
+    optimum_memo = LocalOptimumMemo(Instance["dimension"], optimum_memo_size) if optimum_memo_size else None
+
+    if resume_state is not None:
+        # Continue a checkpointed search: its current solution is a local optimum of the saved penalties
+        random.setstate(resume_state["random_state"])
+        solution = local_search(resume_state["routes"], penalyzed_distance_matrix, Instance, candidate_lists, profile=profile,
+                                two_opt_memo=two_opt_memo, optimum_memo=optimum_memo, cost_matrix=penalyzed_cost_lists,
+                                candidate_sets=candidate_sets)
+        Best_Solution = Solution(resume_state["best_routes"], distance_matrix, Instance["demands"], Instance["depot"])
+        Best_Cost = resume_state["Best_Cost"]
+        Iterations = resume_state["Iterations"]
+        Iteration_best = resume_state["Iteration_best"]
+        time_best = resume_state["time_best"]
+        start_time = time.time() - resume_state["elapsed"]
+    else:
+        # Create the initial solution, or start from the given one
+        if initial_solution is None:
+            initial_solution = create_initial_solution(Instance, distance_matrix, construction)
+        else:
+            initial_solution = warm_start_solution(Instance, initial_solution)
+        if profile is not None:
+            profile.lap("initial_solution")
+        solution = local_search(initial_solution, penalyzed_distance_matrix, Instance, candidate_lists, profile=profile,
+                                two_opt_memo=two_opt_memo, optimum_memo=optimum_memo, cost_matrix=penalyzed_cost_lists,
+                                candidate_sets=candidate_sets)
+        Best_Cost = calculate_solution_cost(solution, distance_matrix, Instance["depot"])
+        Best_Solution = solution.copy()
+        start_time = time.time()
+        time_best = 0
+        Iteration_best = 0
+        if observers:
+            notify_observers(observers, 0, 0.0, Best_Cost, Best_Cost, [])
+    if optimum_memo is not None:
+        optimum_memo.record(solution.routes)
+    target = termination.target_for(Instance) if termination is not None else None
+    # Run GLS until the time limit is reached or another stopping criterion is met
+    while True:
+        elapsed = time.time() - start_time
+        if elapsed >= time_limit:
+            stop_reason = TIME_LIMIT
+            break
+        if termination is not None:
+            stop_reason = termination.check(target, Best_Cost, Iterations, elapsed, Iteration_best, time_best)
+            if stop_reason is not None:
+                break
         Iterations += 1
         # Penalize features
-        features = choose_penalty_features(solution, penalties, penalyzed_distance_matrix)  
+        features = choose_penalty_features(solution, penalties, penalyzed_cost_lists if penalyzed_cost_lists is not None else penalyzed_distance_matrix)
         for (i, j) in features:
             penalties[i][j] += 1
-
+        if profile is not None:
+            profile.lap("choose_penalty_features")
 
         # Update the distance matrix with penalties
-        penalyzed_distance_matrix = apply_gls_penalty(distance_matrix, penalties, LAMBDA, Penalidade)
+        if sparse_penalties:
+            penalyzed_distance_matrix.refresh_rows(features)
+        else:
+            update_gls_penalty(penalyzed_distance_matrix, distance_matrix, penalties, features, LAMBDA, Penalidade, penalyzed_cost_lists)
+        if two_opt_memo is not None:
+            two_opt_memo.penalize(features)
+        if optimum_memo is not None:
+            optimum_memo.penalize(features)
+        if profile is not None:
+            profile.lap("update_gls_penalty")
 
         # Perform local search
-        solution = local_search(solution, penalyzed_distance_matrix, Instance)
+        if fast_gls:
+            active_customers = {customer for feature in features for customer in feature}
+            solution = local_search(solution, penalyzed_distance_matrix, Instance, candidate_lists, active_customers, profile,
+                                    two_opt_memo, optimum_memo, penalyzed_cost_lists, candidate_sets)
+        else:
+            solution = local_search(solution, penalyzed_distance_matrix, Instance, candidate_lists, profile=profile,
+                                    two_opt_memo=two_opt_memo, optimum_memo=optimum_memo, cost_matrix=penalyzed_cost_lists,
+                                    candidate_sets=candidate_sets)
+        if optimum_memo is not None:
+            optimum_memo.record(solution.routes)
         new_cost = calculate_solution_cost(solution, distance_matrix, Instance["depot"])
         # Update the best solution
         if new_cost < Best_Cost:
             Best_Cost = new_cost
             time_best = time.time() - start_time
             Iteration_best = Iterations
-            Best_Solution = copy.deepcopy(solution)
-        # Perform a final local search on the best solution
-    Best_Solution = local_search(Best_Solution, distance_matrix, Instance)
-    return Best_Solution, time_best, Iteration_best
\ No newline at end of file
+            Best_Solution = solution.copy()
+        if profile is not None:
+            profile.lap("best_update")
+        if observers:
+            notify_observers(observers, Iterations, time.time() - start_time, new_cost, Best_Cost, features)
+            if profile is not None:
+                profile.lap("observers")
+        # Cooperation with other searches
+        if sync is not None:
+            restart = sync(solution, Best_Solution, Best_Cost, penalties, penalyzed_distance_matrix, penalyzed_cost_lists)
+            if restart is not None:
+                solution = restart
+            if profile is not None:
+                profile.lap("sync")
+        if checkpoint is not None and checkpoint.due():
+            checkpoint.save(_search_state(Instance, LAMBDA, Penalidade, penalties, solution, Best_Solution, Best_Cost,
+                                          Iterations, Iteration_best, time_best, time.time() - start_time))
+            if profile is not None:
+                profile.lap("checkpoint")
+    if checkpoint is not None:
+        checkpoint.save(_search_state(Instance, LAMBDA, Penalidade, penalties, solution, Best_Solution, Best_Cost,
+                                      Iterations, Iteration_best, time_best, time.time() - start_time))
+    # Perform a final local search on the best solution
+    Best_Solution = local_search(Best_Solution, final_distance_matrix, Instance, candidate_lists, profile=profile,
+                                 candidate_sets=candidate_sets)
+    if profile is not None:
+        profile.iterations += Iterations
+        if optimum_memo is not None:
+            profile.local_optima = optimum_memo.summary()
+        profile.elapsed += time.time() - start_time
+    return Best_Solution, time_best, Iteration_best, stop_reason
+
+def _search_state(Instance, LAMBDA, Penalidade, penalties, solution, Best_Solution, Best_Cost, Iterations, Iteration_best,
+                  time_best, elapsed):
+    """State of a guided_local_search run, as saved by a Checkpoint.Checkpointer."""
+    return {"instance": Instance["name"],
+            "LAMBDA": LAMBDA,
+            "Penalidade": Penalidade,
+            "penalties": penalties,
+            "routes": [list(route) for route in solution],
+            "best_routes": [list(route) for route in Best_Solution],
+            "Best_Cost": Best_Cost,
+            "Iterations": Iterations,
+            "Iteration_best": Iteration_best,
+            "time_best": time_best,
+            "elapsed": elapsed,
+            "random_state": random.getstate()}
\ No newline at end of file
@@ -1,5 +1,14 @@
-import copy
-from Utilities import calculate_route_cost, calculate_vehicle_capacity
+import numpy as np
+from collections import OrderedDict
+from Utilities import calculate_route_cost
+from Solution import Solution
+
+# Gains below this are rounding noise of the penalized costs; accepting them lets zero-gain moves cycle forever
+IMPROVEMENT_TOLERANCE = 1e-9
+# Rows of the distance matrix sorted at once when building the candidate lists
+CANDIDATE_BLOCK_ROWS = 512
+# Routes remembered by a TwoOptMemo
+TWO_OPT_MEMO_SIZE = 4096
 
 
 # Relocate operator
@@ -24,117 +33,450 @@ def cross(solution, vehicle1, index1, vehicle2, index2):
     solution[vehicle2] = new_route2
     return solution
 
+MOVE_OPERATORS = {"relocate": relocate, "exchange": exchange, "cross": cross}
+
+# Delta evaluation of the operators
+def relocate_delta(route1, index1, route2, distance_matrix, depot):
+    """Cost change of moving route1[index1] to the front of route2, from the edges that change."""
+    customer = route1[index1]
+    prev = route1[index1 - 1] if index1 > 0 else depot
+    next_1 = route1[index1 + 1] if index1 + 1 < len(route1) else depot
+    first = route2[0] if route2 else depot
+    removed = distance_matrix[prev][next_1] - distance_matrix[prev][customer] - distance_matrix[customer][next_1]
+    inserted = distance_matrix[depot][customer] + distance_matrix[customer][first] - distance_matrix[depot][first]
+    return removed + inserted
+
+def exchange_delta(route1, index1, route2, index2, distance_matrix, depot):
+    """Cost change of swapping route1[index1] and route2[index2], from the edges that change."""
+    customer_1 = route1[index1]
+    customer_2 = route2[index2]
+    prev_1 = route1[index1 - 1] if index1 > 0 else depot
+    next_1 = route1[index1 + 1] if index1 + 1 < len(route1) else depot
+    prev_2 = route2[index2 - 1] if index2 > 0 else depot
+    next_2 = route2[index2 + 1] if index2 + 1 < len(route2) else depot
+    delta_1 = (distance_matrix[prev_1][customer_2] + distance_matrix[customer_2][next_1]
+               - distance_matrix[prev_1][customer_1] - distance_matrix[customer_1][next_1])
+    delta_2 = (distance_matrix[prev_2][customer_1] + distance_matrix[customer_1][next_2]
+               - distance_matrix[prev_2][customer_2] - distance_matrix[customer_2][next_2])
+    return delta_1 + delta_2
+
+def cross_delta(route1, index1, route2, index2, distance_matrix, depot):
+    """Cost change of swapping the tails after route1[index1] and route2[index2], from the edges that change."""
+    customer_1 = route1[index1]
+    customer_2 = route2[index2]
+    next_1 = route1[index1 + 1] if index1 + 1 < len(route1) else depot
+    next_2 = route2[index2 + 1] if index2 + 1 < len(route2) else depot
+    return (distance_matrix[customer_1][next_2] + distance_matrix[customer_2][next_1]
+            - distance_matrix[customer_1][next_1] - distance_matrix[customer_2][next_2])
+
+# Granular neighbourhoods
+def create_candidate_lists(distance_matrix, k):
+    """
+    Builds the k-nearest-neighbour candidate lists used by the granular local search.
+
+    Parameters:
+    - distance_matrix (2D array): Distance matrix indexed by the 1-based node numbers.
+    - k (int): Number of nearest nodes kept for each node.
+
+    Returns:
+    - candidate_lists (list of lists): candidate_lists[i] holds the k nodes closest to i,
+      nearest first (the depot included); candidate_lists[0] is empty.
+    """
+    dimension = len(distance_matrix)
+    k = max(0, min(k, dimension - 2))
+    candidate_lists = [[]]
+    # Blocks of rows, so that large instances never need a float copy of the whole matrix
+    for start in range(1, dimension, CANDIDATE_BLOCK_ROWS):
+        stop = min(start + CANDIDATE_BLOCK_ROWS, dimension)
+        if hasattr(distance_matrix, "submatrix"):
+            distances = distance_matrix.submatrix(np.arange(start, stop), np.arange(dimension)).astype(float)
+        else:
+            distances = np.array(distance_matrix[start:stop], dtype=float)
+        distances[:, 0] = np.inf
+        distances[np.arange(stop - start), np.arange(start, stop)] = np.inf
+        nearest = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        candidate_lists.extend(row.tolist() for row in nearest)
+    return candidate_lists
+
+def create_candidate_sets(candidate_lists):
+    """The candidate lists as sets, for the membership tests of is_candidate_edge."""
+    return [set(candidates) for candidates in candidate_lists]
+
+def is_candidate_edge(node1, node2, candidate_sets):
+    """Whether the edge between two nodes belongs to the granular graph (either endpoint lists the other)."""
+    return node2 in candidate_sets[node1] or node1 in candidate_sets[node2]
+
+def _relocate_is_granular(route1, index1, route2, depot, candidate_sets):
+    """Whether moving route1[index1] to the front of route2 creates at least one candidate edge."""
+    customer = route1[index1]
+    prev = route1[index1 - 1] if index1 > 0 else depot
+    next_1 = route1[index1 + 1] if index1 + 1 < len(route1) else depot
+    first = route2[0] if route2 else depot
+    return (is_candidate_edge(depot, customer, candidate_sets) or is_candidate_edge(customer, first, candidate_sets)
+            or is_candidate_edge(prev, next_1, candidate_sets))
+
 # Local search method
-# Optimized Two-opt procedure
+# Vectorized Two-opt procedure
 def two_opt(route, distance_matrix, depot):
-    """Perform the two-opt operation on a single vehicle route with fewer redundant computations."""
-    best_route = route[:]
-    best_cost = calculate_route_cost(route, distance_matrix, depot)
+    """
+    Perform the best-improvement two-opt operation on a single vehicle route.
+
+    The gain of every segment reversal route[i..j] is computed at once in a numpy
+    delta matrix from the two boundary edges and prefix sums of the inner edges in
+    both directions (the penalized matrix is not symmetric). The candidate pairs and
+    tie-breaking are the same as the pairwise scheme: i in [1, n-3], j in [i+1, n-2],
+    first best pair in (i, j) order (up to floating point rounding between equal gains).
+
+    Only the costs between the nodes of the route are read, through the submatrix method of
+    the matrix when it has one (Guided_Local_Search.LazyPenalizedMatrix).
+    """
     n = len(route)
-
-    for i in range(1, n - 2):
-        for j in range(i + 1, n - 1):
-            # Reverse the segment
-            new_route = route[:i] + route[i:j + 1][::-1] + route[j + 1:]
-            new_cost = calculate_route_cost(new_route, distance_matrix, depot)
-
-            # Update best if improved
-            if new_cost < best_cost:
-                best_route = new_route
-                best_cost = new_cost
-
-    return best_route
+    if n < 4:
+        return route[:]
+    # Costs between the nodes of the route, indexed by position in the route
+    if hasattr(distance_matrix, "submatrix"):
+        cost = distance_matrix.submatrix(route)
+    else:
+        cost = np.asarray(distance_matrix)[np.ix_(route, route)]
+    nodes = np.arange(n)
+
+    # prefix[k] = cost of the edges route[0] -> ... -> route[k], walked forward or backward
+    forward_prefix = np.concatenate(([0.0], np.cumsum(cost[nodes[:-1], nodes[1:]])))
+    backward_prefix = np.concatenate(([0.0], np.cumsum(cost[nodes[1:], nodes[:-1]])))
+
+    i = np.arange(1, n - 2)[:, None]
+    j = np.arange(2, n - 1)[None, :]
+    before, first, last, after = nodes[i - 1], nodes[i], nodes[j], nodes[j + 1]
+    delta = (cost[before, last] + cost[first, after] - cost[before, first] - cost[last, after]
+             + (backward_prefix[j] - backward_prefix[i]) - (forward_prefix[j] - forward_prefix[i]))
+    delta = np.where(j > i, delta, np.inf)
+
+    best = np.argmin(delta)
+    if delta.flat[best] >= -IMPROVEMENT_TOLERANCE:
+        return route[:]
+    best_i, best_j = np.unravel_index(best, delta.shape)
+    best_i = int(best_i) + 1
+    best_j = int(best_j) + 2
+    return route[:best_i] + route[best_i:best_j + 1][::-1] + route[best_j + 1:]
+
+class TwoOptMemo:
+    """
+    LRU memo of two_opt results over one (penalized) distance matrix, across local_search
+    passes and GLS iterations.
+
+    The result of two_opt depends on the costs between the nodes of the route, so an entry is
+    keyed by the route and stamped with the sum of the penalty versions of its nodes. penalize
+    bumps the version of both endpoints of every newly penalized feature: the routes holding
+    them get a new stamp and are recomputed, all other routes are served from the memo.
+    Versions only grow, so a route's stamp changes exactly when one of its nodes was touched.
+    """
+
+    def __init__(self, dimension, maxsize=TWO_OPT_MEMO_SIZE):
+        """
+        Parameters:
+        - dimension (int): Number of nodes of the instance.
+        - maxsize (int): Number of routes kept (least recently used first out).
+        """
+        self.versions = [0] * (dimension + 1)
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def penalize(self, features):
+        """Invalidates the routes holding both endpoints of a newly penalized feature (i, j)."""
+        for (i, j) in features:
+            self.versions[i] += 1
+            self.versions[j] += 1
+
+    def two_opt(self, route, distance_matrix, depot):
+        """two_opt(route, distance_matrix, depot), from the memo when the route is unchanged."""
+        versions = self.versions
+        key = tuple(route)
+        stamp = sum(versions[node] for node in route)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[1][:]
+        self.misses += 1
+        new_route = two_opt(route, distance_matrix, depot)
+        self.entries[key] = (stamp, new_route[:])
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return new_route
 
 # Optimized Local Search
-def local_search(solution, distance_matrix, instance):
-    """Greedy local search with best acceptance scheme and optimized performance."""
+def local_search(solution, distance_matrix, instance, candidate_lists=None, active_customers=None, profile=None,
+                 two_opt_memo=None, optimum_memo=None, cost_matrix=None, candidate_sets=None):
+    """
+    Greedy local search with best acceptance scheme.
+
+    Moves are scored in O(1) by the delta functions against cached per-route
+    costs, loads and prefix loads of a Solution; only the best move of each pass is
+    applied. The input (a Solution or a list of routes) is not modified; a new
+    Solution, with costs measured on distance_matrix, is returned.
+
+    With candidate_lists (see create_candidate_lists) the search is granular: relocate,
+    exchange and cross moves are only evaluated when they create at least one edge
+    between a node and one of its nearest neighbours, and exchange/cross are generated
+    from those neighbours instead of sweeping every pair of positions.
+
+    With active_customers (don't-look bits, used by the fast GLS mode) only the moves of
+    the active customers are scanned. A customer without any feasible improving move is
+    switched off, and the customers whose neighbours change with an applied move are
+    switched on again. The search stops when no active customer can improve.
+
+    profile (a Profiling.SearchProfile) collects the per-operator counters and phase times.
+
+    two_opt_memo (a TwoOptMemo built for distance_matrix) serves the two-opt of the routes
+    unchanged since an earlier pass or call.
+
+    optimum_memo (a Guided_Local_Search.LocalOptimumMemo) recognizes the local optima already
+    recorded: from one of them only the moves of the endpoints of the edges penalized since it
+    was recorded can improve, so the pass is restricted to those customers (and the search
+    stops at once when there are none).
+
+    cost_matrix is distance_matrix as nested lists, read by the delta evaluations and the route
+    costs. Without it a dense matrix is converted on every call (O(n²)); a caller running many
+    searches over the same matrix keeps one up to date instead (guided_local_search does).
+
+    candidate_sets are the candidate_lists as sets (see create_candidate_sets), built here when
+    not given; they never change during a run, so guided_local_search builds them once.
+    """
     depot = instance["depot"]
     demands = instance["demands"]
     capacity = instance["capacity"]
-    vehicle_capacities = [calculate_vehicle_capacity(route, demands) for route in solution]
+    # Plain nested lists are much faster than numpy for scalar indexing
+    if cost_matrix is None:
+        cost_matrix = distance_matrix.tolist() if hasattr(distance_matrix, "tolist") else distance_matrix
+
+    # Route costs, loads, prefix loads and customer positions, refreshed by the Solution for the routes each move touches
+    solution = Solution(solution, cost_matrix, demands, depot)
+    routes = solution.routes
+    route_costs = solution.route_costs
+    vehicle_capacities = solution.loads
+    prefix_loads = solution.prefix_loads
+    positions = solution.positions
+
+    if candidate_lists is not None:
+        if candidate_sets is None:
+            candidate_sets = create_candidate_sets(candidate_lists)
+    if active_customers is not None:
+        active = set(active_customers)
+    if profile is not None:
+        customer_count = len(positions)
+        profile.lap("local_search_setup")
 
     while True:
-        best_improvement = 0
-        best_solution = None
-
-        for vehicle in range(len(solution)):
-            current_route = solution[vehicle]
-            current_cost = calculate_route_cost(current_route, distance_matrix, depot)
+        best_improvement = IMPROVEMENT_TOLERANCE
+        best_move = None
+        # Active customers with at least one feasible improving move in this pass
+        improving = set()
+
+        if active_customers is not None:
+            if not active:
+                break
+        # Customers scanned in this pass (None: all of them)
+        scope = active if active_customers is not None else None
+        if optimum_memo is not None:
+            recheck = optimum_memo.customers_to_recheck(routes)
+            if recheck is not None:
+                if not recheck:
+                    break
+                scope = recheck
+        if scope is not None:
+            active_vehicles = {positions[customer][0] for customer in scope}
+
+        for vehicle in range(len(routes)):
+            if scope is not None and vehicle not in active_vehicles:
+                continue
+            current_route = routes[vehicle]
+            current_load = vehicle_capacities[vehicle]
+            current_prefix = prefix_loads[vehicle]
+            if scope is None:
+                scanned = list(enumerate(current_route))
+            else:
+                scanned = [(index, customer) for index, customer in enumerate(current_route) if customer in scope]
+            if profile is not None:
+                if candidate_lists is None:
+                    # The full Exchange/Cross sweep evaluates both moves for every pair (scanned customer, customer of another route)
+                    profile.considered["exchange"] += len(scanned) * (customer_count - len(current_route))
+                    profile.considered["cross"] += len(scanned) * (customer_count - len(current_route))
+                two_opt_misses = two_opt_memo.misses if two_opt_memo is not None else None
+                profile.lap("local_search_setup")
 
             # Two-opt improvement
-            new_route = two_opt(current_route, distance_matrix, depot)
-            new_cost = calculate_route_cost(new_route, distance_matrix, depot)
-            improvement = current_cost - new_cost
-
-            if improvement > best_improvement:
-                best_improvement = improvement
-                best_solution = copy.deepcopy(solution[:])
-                best_solution[vehicle] = new_route
+            if two_opt_memo is not None:
+                new_route = two_opt_memo.two_opt(current_route, distance_matrix, depot)
+            else:
+                new_route = two_opt(current_route, distance_matrix, depot)
+            improvement = route_costs[vehicle] - calculate_route_cost(new_route, cost_matrix, depot)
+            if profile is not None:
+                if two_opt_misses is None or two_opt_memo.misses > two_opt_misses:
+                    # Every reversal (i, j) scored by two_opt (none when the memo served the route)
+                    profile.considered["two_opt"] += max(0, (len(current_route) - 3) * (len(current_route) - 2) // 2)
+                profile.lap("two_opt")
+
+            if improvement > IMPROVEMENT_TOLERANCE:
+                improving.update(customer for _, customer in scanned)
+                if improvement > best_improvement:
+                    best_improvement = improvement
+                    best_move = ("two_opt", vehicle, new_route)
 
             # Relocation improvement
-            for other_vehicle in range(len(solution)):
+            relocate_evaluations = 0
+            for other_vehicle in range(len(routes)):
                 if other_vehicle == vehicle:
                     continue
+                other_route = routes[other_vehicle]
 
-                for from_index, customer in enumerate(current_route):
+                for from_index, customer in scanned:
                     if vehicle_capacities[other_vehicle] + demands[customer - 1] <= capacity:
-                        temp_solution = [route[:] for route in solution]
-                        relocate(temp_solution, vehicle, from_index, other_vehicle, 0)
-
-                        # Compute improvement
-                        new_cost_vehicle = calculate_route_cost(temp_solution[vehicle], distance_matrix, depot)
-                        new_cost_other = calculate_route_cost(temp_solution[other_vehicle], distance_matrix, depot)
-                        total_new_cost = new_cost_vehicle + new_cost_other
-
-                        improvement = (current_cost + calculate_route_cost(solution[other_vehicle], distance_matrix, depot)) - total_new_cost
-
-                        if improvement > best_improvement and calculate_vehicle_capacity(temp_solution[vehicle], demands) <= capacity and  calculate_vehicle_capacity(temp_solution[other_vehicle], demands) <= capacity:
-                            best_improvement = improvement
-                            best_solution = copy.deepcopy(temp_solution)
+                        if candidate_lists is not None and not _relocate_is_granular(current_route, from_index, other_route, depot, candidate_sets):
+                            continue
+                        relocate_evaluations += 1
+                        improvement = -relocate_delta(current_route, from_index, other_route, cost_matrix, depot)
+
+                        if improvement > IMPROVEMENT_TOLERANCE:
+                            improving.add(customer)
+                            if improvement > best_improvement:
+                                best_improvement = improvement
+                                best_move = ("relocate", vehicle, from_index, other_vehicle, 0)
+
+            if profile is not None:
+                profile.considered["relocate"] += relocate_evaluations
+                profile.lap("relocate")
+
+            if candidate_lists is not None:
+                # Granular Exchange and Cross: moves that create an edge (customer_1, neighbour)
+                exchange_evaluations = 0
+                cross_evaluations = 0
+                for from_index, customer_1 in scanned:
+                    for neighbour in candidate_lists[customer_1]:
+                        if neighbour == depot:
+                            continue
+                        other_vehicle, position = positions[neighbour]
+                        if other_vehicle == vehicle:
+                            continue
+                        other_route = routes[other_vehicle]
+                        other_load = vehicle_capacities[other_vehicle]
+                        other_prefix = prefix_loads[other_vehicle]
+
+                        for operator, index1, index2 in (("exchange", from_index, position - 1),
+                                                         ("exchange", from_index, position + 1),
+                                                         ("exchange", from_index + 1, position),
+                                                         ("exchange", from_index - 1, position),
+                                                         ("cross", from_index, position - 1),
+                                                         ("cross", from_index - 1, position)):
+                            if not (0 <= index1 < len(current_route) and 0 <= index2 < len(other_route)):
+                                continue
+                            if operator == "exchange":
+                                exchange_evaluations += 1
+                                improvement = -exchange_delta(current_route, index1, other_route, index2, cost_matrix, depot)
+                                if improvement > IMPROVEMENT_TOLERANCE:
+                                    demand_1 = demands[current_route[index1] - 1]
+                                    demand_2 = demands[other_route[index2] - 1]
+                                    if current_load - demand_1 + demand_2 <= capacity and other_load - demand_2 + demand_1 <= capacity:
+                                        improving.add(customer_1)
+                                        if improvement > best_improvement:
+                                            best_improvement = improvement
+                                            best_move = ("exchange", vehicle, index1, other_vehicle, index2)
+                            else:
+                                cross_evaluations += 1
+                                improvement = -cross_delta(current_route, index1, other_route, index2, cost_matrix, depot)
+                                if improvement > IMPROVEMENT_TOLERANCE:
+                                    head_1 = current_prefix[index1 + 1]
+                                    head_2 = other_prefix[index2 + 1]
+                                    if head_1 + other_load - head_2 <= capacity and head_2 + current_load - head_1 <= capacity:
+                                        improving.add(customer_1)
+                                        if improvement > best_improvement:
+                                            best_improvement = improvement
+                                            best_move = ("cross", vehicle, index1, other_vehicle, index2)
+                if profile is not None:
+                    profile.considered["exchange"] += exchange_evaluations
+                    profile.considered["cross"] += cross_evaluations
+                    profile.lap("exchange_cross")
+                continue
 
             # Exchange and Cross improvements (merged for efficiency)
-            for other_vehicle in range(len(solution)):
+            for other_vehicle in range(len(routes)):
                 if other_vehicle == vehicle:
                     continue
+                other_route = routes[other_vehicle]
+                other_load = vehicle_capacities[other_vehicle]
+                other_prefix = prefix_loads[other_vehicle]
 
-                for from_index, customer_1 in enumerate(current_route):
-                    for to_index, customer_2 in enumerate(solution[other_vehicle]):
+                for from_index, customer_1 in scanned:
+                    demand_1 = demands[customer_1 - 1]
+                    for to_index, customer_2 in enumerate(other_route):
                         # Exchange
-                        temp_solution = [route[:] for route in solution]
-                        exchange(temp_solution, vehicle, from_index, other_vehicle, to_index)
-
-                        # Compute improvement
-                        new_cost_vehicle = calculate_route_cost(temp_solution[vehicle], distance_matrix, depot)
-                        new_cost_other = calculate_route_cost(temp_solution[other_vehicle], distance_matrix, depot)
-                        total_new_cost = new_cost_vehicle + new_cost_other
-
-                        improvement = (current_cost + calculate_route_cost(solution[other_vehicle], distance_matrix, depot)) - total_new_cost
-
-                        if improvement > best_improvement and calculate_vehicle_capacity(temp_solution[vehicle], demands) <= capacity and  calculate_vehicle_capacity(temp_solution[other_vehicle], demands) <= capacity:
-                            best_improvement = improvement
-                            best_solution = copy.deepcopy(temp_solution)
+                        improvement = -exchange_delta(current_route, from_index, other_route, to_index, cost_matrix, depot)
 
+                        if improvement > IMPROVEMENT_TOLERANCE:
+                            demand_2 = demands[customer_2 - 1]
+                            if current_load - demand_1 + demand_2 <= capacity and other_load - demand_2 + demand_1 <= capacity:
+                                improving.add(customer_1)
+                                if improvement > best_improvement:
+                                    best_improvement = improvement
+                                    best_move = ("exchange", vehicle, from_index, other_vehicle, to_index)
 
                         # Cross
-                        temp_solution = [route[:] for route in solution]
-                        cross(temp_solution, vehicle, from_index, other_vehicle, to_index)
-
-                        # Compute improvement
-                        new_cost_vehicle = calculate_route_cost(temp_solution[vehicle], distance_matrix, depot)
-                        new_cost_other = calculate_route_cost(temp_solution[other_vehicle], distance_matrix, depot)
-                        total_new_cost = new_cost_vehicle + new_cost_other
-
-                        improvement = (current_cost + calculate_route_cost(solution[other_vehicle], distance_matrix, depot)) - total_new_cost
-
-                        if improvement > best_improvement and calculate_vehicle_capacity(temp_solution[vehicle], demands) <= capacity and  calculate_vehicle_capacity(temp_solution[other_vehicle], demands) <= capacity:
-                            best_improvement = improvement
-                            best_solution = copy.deepcopy(temp_solution)
-
+                        improvement = -cross_delta(current_route, from_index, other_route, to_index, cost_matrix, depot)
+
+                        if improvement > IMPROVEMENT_TOLERANCE:
+                            head_1 = current_prefix[from_index + 1]
+                            head_2 = other_prefix[to_index + 1]
+                            if head_1 + other_load - head_2 <= capacity and head_2 + current_load - head_1 <= capacity:
+                                improving.add(customer_1)
+                                if improvement > best_improvement:
+                                    best_improvement = improvement
+                                    best_move = ("cross", vehicle, from_index, other_vehicle, to_index)
+            if profile is not None:
+                profile.lap("exchange_cross")
 
         # Stop if no improvements
-        if best_improvement <= 0:
+        if best_move is None:
             break
 
-        solution = copy.deepcopy(best_solution)
+        # Apply only the winning move; the Solution refreshes the routes it touched
+        if best_move[0] == "two_opt":
+            _, vehicle, new_route = best_move
+            changed = (vehicle,)
+            old_routes = [routes[vehicle]]
+            solution.set_route(vehicle, new_route)
+        else:
+            operator, vehicle, index1, other_vehicle, index2 = best_move
+            changed = (vehicle, other_vehicle)
+            old_routes = [routes[vehicle][:], routes[other_vehicle][:]]
+            solution.apply_move(MOVE_OPERATORS[operator], vehicle, index1, other_vehicle, index2)
+
+        if profile is not None:
+            profile.record_move(best_move[0], best_improvement)
+
+        if active_customers is not None:
+            # Don't-look bits: keep the customers that can still improve and wake up the
+            # customers whose predecessor or successor changed
+            active &= improving
+            active.update(_customers_with_new_neighbours(old_routes, [routes[vehicle] for vehicle in changed], depot))
+        if profile is not None:
+            profile.lap("apply_move")
+
+    return solution
 
-    return solution
\ No newline at end of file
+def _customers_with_new_neighbours(old_routes, new_routes, depot):
+    """Customers of new_routes whose (predecessor, successor) pair differs from the one they had in old_routes."""
+    old_neighbours = {}
+    for route in old_routes:
+        for index, customer in enumerate(route):
+            old_neighbours[customer] = (route[index - 1] if index > 0 else depot,
+                                        route[index + 1] if index + 1 < len(route) else depot)
+    touched = []
+    for route in new_routes:
+        for index, customer in enumerate(route):
+            neighbours = (route[index - 1] if index > 0 else depot,
+                          route[index + 1] if index + 1 < len(route) else depot)
+            if old_neighbours.get(customer) != neighbours:
+                touched.append(customer)
+    return touched
@@ -1,147 +1,645 @@
+import argparse
 import numpy as np
+import os
+import random
+import contextlib
+import hashlib
+import json
 import re
-from Utilities import euclidean_distance, calculate_solution_cost
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter as timer
+from Utilities import calculate_solution_cost
 from Guided_Local_Search import guided_local_search
-from Grafh import plot_grapfh
+from Local_Search import create_candidate_lists
+from Profiling import SearchProfile
+from Trace import TraceWriter
+from Checkpoint import Checkpointer, resume_guided_local_search
+from Termination import Termination, TIME_LIMIT
+from Distance_Matrix import TriangularDistanceMatrix, open_distance_matrix
+
+# Directory of this file (the paths of the instance lists are relative to it) and of the repository
+CODE_PATH = os.path.dirname(os.path.abspath(__file__))
+BASE_PATH = os.path.normpath(os.path.join(CODE_PATH, ".."))
+INSTANCE_LIST_PATH = os.path.join(BASE_PATH, "Lista de Execucao.txt")
+RESULTS_PATH = os.path.join(BASE_PATH, "Resultados.txt")
+DISTANCE_CACHE_DIR = os.path.join(BASE_PATH, "Cache")
+# Bump when the way distances are computed changes, to invalidate the cached matrices
+DISTANCE_CACHE_VERSION = 2
+# EUC_2D distances are rounded to integers, int32 stores them in half the memory of float64
+DISTANCE_DTYPE = np.int32
+# Rows of the distance matrix computed at once, to bound the float temporaries of large instances
+DISTANCE_BLOCK_ROWS = 512
+# Bumped whenever the binary instance format (save_instance) changes
+INSTANCE_CACHE_VERSION = 1
 
 def parse_vrp_file(file_path):
     """
     Parse a VRP file and create an instance of the problem.
-    
+
+    The header is read line by line, the sections in bulk: the numbers of each section are
+    converted at once into NumPy arrays. Besides NODE_COORD (EUC_2D) instances it reads
+    EXPLICIT edge weights in any TSPLIB EDGE_WEIGHT_FORMAT (kept in "edge_weights", with the
+    DISPLAY_DATA_SECTION, if any, as coordinates). The number of vehicles comes from the
+    comment ("No of trucks") or else from the "-k" suffix of the name (X set), the optimal
+    value from the "Optimal value" or "Best value" of the comment.
+
     Parameters:
     - file_path (str): Path to the VRP file.
-    
+
     Returns:
-    - instance (dict): A dictionary containing the parsed problem parameters.
+    - instance (dict): A dictionary containing the parsed problem parameters. coordinates is
+      a (dimension, 2) float array (empty without coordinates), demands a list (scalar reads
+      of lists are the fastest in the local search).
     """
+    with open(file_path, "rb") as file:
+        content = file.read()
+
+    header = {}
+    sections = {}
+    section = None
+    for line in content.decode().splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        key = line.split(":")[0].strip()
+        if key.endswith("_SECTION"):
+            section = key
+            sections[section] = []
+        elif key == "EOF":
+            break
+        elif ":" in line and key.replace("_", "").isalpha() and key.isupper():
+            section = None
+            header[key] = line.split(":", 1)[1].strip()
+        elif section is not None:
+            sections[section].append(line)
+    sections = {name: np.array(" ".join(lines).split(), dtype=float) for name, lines in sections.items()}
+
+    dimension = int(header["DIMENSION"])
+    comment = header.get("COMMENT", "")
+    trucks = re.search(r"trucks:\s*(\d+)", comment, re.IGNORECASE) or re.search(r"-k(\d+)", header["NAME"])
+    optimal_value = re.search(r"(?:Optimal|Best) value:\s*(\d+)", comment, re.IGNORECASE)
+    if trucks is None:
+        raise ValueError(f"Number of vehicles of {header['NAME']} not found in its comment or name")
+
+    coordinates = sections.get("NODE_COORD_SECTION", sections.get("DISPLAY_DATA_SECTION"))
+    if coordinates is not None:
+        coordinates = coordinates.reshape(-1, 3)
+        coordinates = coordinates[np.argsort(coordinates[:, 0], kind="stable"), 1:]
+    else:
+        coordinates = np.empty((0, 2))
+    demands = sections["DEMAND_SECTION"].reshape(-1, 2)
+    demands = demands[np.argsort(demands[:, 0], kind="stable"), 1].astype(int)
+    depots = sections["DEPOT_SECTION"]
+
     instance = {
-        "name": None,
-        "num_vehicles": None,
-        "optimal_value": None,
-        "type": None,
-        "dimension": None,
-        "capacity": None,
+        "name": header["NAME"],
+        "file_path": file_path,
+        "digest": hashlib.sha1(content).hexdigest()[:16],
+        "num_vehicles": int(trucks.group(1)),
+        "optimal_value": int(optimal_value.group(1)) if optimal_value else None,
+        "type": header.get("TYPE"),
+        "dimension": dimension,
+        "capacity": int(header["CAPACITY"]),
         "vehicle_capacity": None,
-        "coordinates": [],
-        "demands": [],
-        "depot": None
+        "edge_weight_type": header.get("EDGE_WEIGHT_TYPE", "EUC_2D"),
+        "coordinates": coordinates,
+        "edge_weights": None,
+        "demands": demands.tolist(),
+        "depot": int(depots[0])
     }
+    if instance["edge_weight_type"] == "EXPLICIT":
+        instance["edge_weights"] = explicit_edge_weights(sections["EDGE_WEIGHT_SECTION"], dimension,
+                                                         header.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX"))
+    instance["vehicle_capacity"] = [0] * instance["num_vehicles"]
+    return instance
 
-    with open(file_path, "r") as file:
-        lines = file.readlines()
-        
-        section = None
-        for line in lines:
-            line = line.strip()
-            
-            if line.startswith("NAME"):
-                instance["name"] = line.split(":")[1].strip()
-            elif line.startswith("COMMENT"):
-                match = re.search(r"\((.*?)\)", line)
-                if match:
-                    comment_content = match.group(1)
-                    parts = comment_content.split(", ")
-                    for part in parts:
-                        if "No of trucks" in part:
-                            instance["num_vehicles"] = int(re.search(r"\d+", part).group())
-                        elif "Optimal value" in part:
-                            instance["optimal_value"] = int(re.search(r"\d+", part).group())
-            elif line.startswith("TYPE"):
-                instance["type"] = line.split(":")[1].strip()
-            elif line.startswith("DIMENSION"):
-                instance["dimension"] = int(line.split(":")[1].strip())
-            elif line.startswith("CAPACITY"):
-                instance["capacity"] = int(line.split(":")[1].strip())
-            elif line.startswith("NODE_COORD_SECTION"):
-                section = "coordinates"
-            elif line.startswith("DEMAND_SECTION"):
-                section = "demands"
-            elif line.startswith("DEPOT_SECTION"):
-                section = "depot"
-            elif line.startswith("EOF"):
-                break
-            elif section == "coordinates":
-                parts = line.split()
-                if len(parts) == 3:
-                    instance["coordinates"].append((float(parts[1]), float(parts[2])))
-            elif section == "demands":
-                parts = line.split()
-                if len(parts) == 2:
-                    instance["demands"].append(int(parts[1]))
-            elif section == "depot":
-                parts = line.split()
-                if len(parts) == 1 and parts[0] != "-1":
-                    instance["depot"] = int(parts[0])
-        instance["vehicle_capacity"] = [0] * instance["num_vehicles"]
+def explicit_edge_weights(values, dimension, edge_weight_format):
+    """
+    Full (dimension x dimension) matrix of an EDGE_WEIGHT_SECTION.
+
+    Parameters:
+    - values (1D array): Numbers of the section, in file order.
+    - dimension (int): Number of nodes.
+    - edge_weight_format (str): TSPLIB format (FULL_MATRIX, LOWER_ROW, LOWER_DIAG_ROW,
+      UPPER_ROW, UPPER_DIAG_ROW or one of the _COL variants).
+
+    Returns:
+    - edge_weights (2D array): Symmetric matrix of the weights.
+    """
+    if edge_weight_format == "FULL_MATRIX":
+        return values[:dimension * dimension].reshape(dimension, dimension)
+    # A column-wise lower triangle lists the same numbers as the row-wise upper one, and vice versa
+    layouts = {"LOWER_ROW": (np.tril_indices, -1), "LOWER_DIAG_ROW": (np.tril_indices, 0),
+               "UPPER_ROW": (np.triu_indices, 1), "UPPER_DIAG_ROW": (np.triu_indices, 0),
+               "UPPER_COL": (np.tril_indices, -1), "UPPER_DIAG_COL": (np.tril_indices, 0),
+               "LOWER_COL": (np.triu_indices, 1), "LOWER_DIAG_COL": (np.triu_indices, 0)}
+    if edge_weight_format not in layouts:
+        raise ValueError(f"Unsupported EDGE_WEIGHT_FORMAT {edge_weight_format}")
+    indices, offset = layouts[edge_weight_format]
+    rows, columns = indices(dimension, offset)
+    edge_weights = np.zeros((dimension, dimension))
+    edge_weights[rows, columns] = values[:len(rows)]
+    edge_weights[columns, rows] = values[:len(rows)]
+    return edge_weights
+
+def instance_cache_path(file_path, cache_dir=DISTANCE_CACHE_DIR):
+    """
+    Path of the binary (.npz) copy of a VRP file, converted with save_instance if it is not in
+    the cache yet. Keyed like distance_matrix_cache_path (name, content hash, INSTANCE_CACHE_VERSION).
+    """
+    with open(file_path, "rb") as file:
+        digest = hashlib.sha1(file.read()).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    path = os.path.join(cache_dir, f"{name}-{digest}-instance-v{INSTANCE_CACHE_VERSION}.npz")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        temporary_path = f"{path[:-len('.npz')]}.{os.getpid()}.tmp.npz"
+        save_instance(parse_vrp_file(file_path), temporary_path)
+        os.replace(temporary_path, path)
+    return path
+
+def save_instance(Instance, path):
+    """Writes an instance to a compact .npz file (the arrays, plus the scalar fields as JSON)."""
+    scalars = {key: value for key, value in Instance.items()
+               if key not in ("coordinates", "demands", "edge_weights", "vehicle_capacity")}
+    arrays = {"coordinates": np.asarray(Instance["coordinates"], dtype=float), "demands": np.asarray(Instance["demands"])}
+    if Instance.get("edge_weights") is not None:
+        arrays["edge_weights"] = np.asarray(Instance["edge_weights"])
+    np.savez(path, header=np.array(json.dumps(scalars)), **arrays)
+
+def load_instance(file_path, cache_dir=DISTANCE_CACHE_DIR):
+    """
+    Loads an instance through the binary cache: a VRP file is parsed once and then read from
+    its .npz copy (see instance_cache_path); a .npz path is read directly.
+
+    Parameters:
+    - file_path (str): VRP file or .npz written by save_instance.
+    - cache_dir (str, optional): Directory of the cache; None always parses the VRP file.
+
+    Returns:
+    - instance (dict): Same as parse_vrp_file.
+    """
+    if not file_path.endswith(".npz"):
+        if cache_dir is None:
+            return parse_vrp_file(file_path)
+        file_path = instance_cache_path(file_path, cache_dir)
+    with np.load(file_path) as data:
+        instance = json.loads(str(data["header"]))
+        instance["coordinates"] = data["coordinates"]
+        instance["demands"] = data["demands"].tolist()
+        instance["edge_weights"] = data["edge_weights"] if "edge_weights" in data else None
+    instance["vehicle_capacity"] = [0] * instance["num_vehicles"]
     return instance
 
-def get_path_instance(file_path, lam, Penalidade, iterations=1):
+def get_path_instance(file_path, lam, Penalidade, iterations=1, granular_k=None, fast_gls=False, workers=1, seed=0,
+                      cache_dir=DISTANCE_CACHE_DIR, termination=None, construction="random", storage="dense",
+                      time_limit=300, results_path=RESULTS_PATH):
     """
     Processes a TXT file and create the instance obect and runs multiple iterations of the main function.
 
     Parameters:
-    - file_path (str): Path to the file containing the VRP problem instances.
+    - file_path (str): Path to the file containing the VRP problem instances (see read_instance_list).
     - lam (float): Adjustment parameter used in the main function.
     - Penalidade (float): Penalty applied during the algorithm execution.
     - iterations (int, optional): Number of iterations to run for each instance (default: 1).
+    - granular_k (int, optional): Size of the nearest-neighbour candidate lists of the
+      granular local search (default: None, full neighbourhoods).
+    - fast_gls (bool, optional): Run the GLS iterations with don't-look bits (default: False).
+    - workers (int, optional): Number of processes running the repetitions (default: 1, serial).
+    - seed (int, optional): Base seed of the runs, see run_seed (default: 0).
+    - cache_dir (str, optional): Directory of the distance matrix cache (None disables it).
+    - termination (Termination, optional): Early stopping criteria of every run (default: None, full time limit).
+    - construction (str, optional): Construction of the initial solutions, see Construction.create_initial_solution
+      (default: "random").
+    - storage (str, optional): Storage of the distance matrices, see load_distance_matrix (default: "dense").
+    - time_limit (float, optional): Time limit of every run, in seconds (default: 300).
+    - results_path (str, optional): Text file the summaries are appended to (default: RESULTS_PATH).
 
-    This function reads a path of files of instances line by line, processes each instance, 
-    by calling the function of hte cration of the instace object, 
+    This function reads a path of files of instances line by line, processes each instance,
+    by calling the function of hte cration of the instace object,
     executes the main function multiple times, and logs the results to a file.
     """
+    paths = read_instance_list(file_path)
+    instances = [load_instance(path, cache_dir) if cache_dir is not None else parse_vrp_file(path) for path in paths]
+    all_results = run_repetitions(instances, lam, Penalidade, iterations, granular_k, fast_gls, workers, seed, cache_dir,
+                                  termination, construction, storage, time_limit)
+    for instance, results in zip(instances, all_results):
+        for result in results:
+            if result["stop_reason"] != TIME_LIMIT:
+                print(f"{instance['name']}: parada antecipada ({result['stop_reason']})")
+        with open(results_path, 'a', encoding='utf-8') as Output:
+            Output.write(format_summary(instance, results))
+        print(instance["name"])
+
+def format_summary(instance, results):
+    """Text summary (best and mean cost, time, iterations and gap) of the repetitions of an instance, as in Resultados.txt."""
+    costs = [result["cost"] for result in results]
+    times = [result["time_best"] for result in results]
+    iterations = [result["iteration_best"] for result in results]
+    Benchmark = instance["optimal_value"]
+    lines = ["*************************************************************************************************************",
+             f" Nome da Instancia: {instance['name']}",
+             f"[Melhor Custo: {min(costs):.2f} | Media do Custo: {sum(costs) / len(costs):.2f} | "
+             f"Melhor Custo Possivel: {Benchmark if Benchmark is not None else float('nan'):.2f}]",
+             f"[Melhor Tempo: {min(times):.2f} | Media de Tempo: {sum(times) / len(times):.2f}]",
+             f"[Melhor Numero de Iterações: {min(iterations):.2f} | Media do Numero de Iterações: {sum(iterations) / len(iterations):.2f}]"]
+    if Benchmark:
+        lines.append(f"[Melhor Gap: {(min(costs) - Benchmark) / Benchmark:.5f} | Media da Gap: {((sum(costs) / len(costs)) - Benchmark) / Benchmark:.5f}]")
+    lines.append("*************************************************************************************************************")
+    return "\n".join(lines) + "\n"
+
+def read_instance_list(file_path):
+    """
+    Paths of the instances listed in a TXT file, one per line.
+
+    The lists were written on Windows with paths relative to Code ("..\\Set A\\A\\A-n32-k5.vrp"):
+    backslashes are read as separators, and a relative path is looked up from the current
+    directory, then from Code, then from the directory of the list.
+    """
+    paths = []
+    with open(file_path, "r") as file:
+        for line in file:
+            path = line.strip().replace("\\", "/")
+            if not path:
+                continue
+            if not os.path.isabs(path):
+                for base in (os.getcwd(), CODE_PATH, os.path.dirname(os.path.abspath(file_path))):
+                    if os.path.exists(os.path.join(base, path)):
+                        path = os.path.normpath(os.path.join(base, path))
+                        break
+            paths.append(path)
+    return paths
+
+def run_seed(seed, instance, repetition):
+    """Deterministic seed of one repetition, independent of the worker and of the order the runs finish in."""
+    return f"{seed}:{instance['name']}:{repetition}"
+
+def run_repetitions(instances, Lambda, Penalidade, iterations, granular_k=None, fast_gls=False, workers=1, seed=0,
+                    cache_dir=DISTANCE_CACHE_DIR, termination=None, construction="random", storage="dense", time_limit=300,
+                    trace_dir=None):
+    """
+    Runs solve `iterations` times for each instance, serially or on a process pool.
+
+    With workers > 1 every (instance, repetition) pair is a separate task, so the repetitions
+    and the instances of the list are spread over the pool. The workers open the distance matrices
+    from the on-disk cache (a temporary one when cache_dir is None) as read-only memmaps, so all
+    the processes share the same pages instead of receiving a copy.
+
+    Parameters:
+    - instances (list of dicts): Parsed instances.
+    - Lambda (float), Penalidade (float), granular_k (int), fast_gls (bool), termination (Termination),
+      construction (str), time_limit (float): See solve.
+    - iterations (int): Number of repetitions of each instance.
+    - workers (int, optional): Number of processes (default: 1, serial).
+    - seed (int, optional): Base seed; repetition r of an instance is seeded with run_seed(seed, instance, r).
+    - cache_dir (str, optional): Directory of the distance matrix cache, see load_distance_matrix.
+    - storage (str, optional): Storage of the distance matrices, see load_distance_matrix.
+    - trace_dir (str, optional): Directory of the iteration traces, one "<name>-<repetition>.jsonl" per run.
+
+    Yields:
+    - results (list of dicts): For each instance, in order, the results of solve of its repetitions.
+    """
+    options = {"LAMBDA": Lambda, "Penalidade": Penalidade, "granular_k": granular_k, "fast_gls": fast_gls,
+               "termination": termination, "construction": construction, "time_limit": time_limit}
+
+    def trace_path(instance, repetition):
+        return os.path.join(trace_dir, f"{instance['name']}-{repetition}.jsonl") if trace_dir else None
+
+    if workers <= 1:
+        for instance in instances:
+            distance_matrix = load_distance_matrix(instance, cache_dir, storage)
+            yield [solve(instance, seed=run_seed(seed, instance, repetition), distance_matrix=distance_matrix,
+                         trace_path=trace_path(instance, repetition), **options)
+                   for repetition in range(iterations)]
+        return
+
+    with tempfile.TemporaryDirectory() if cache_dir is None else contextlib.nullcontext(cache_dir) as matrix_dir:
+        matrix_paths = [distance_matrix_cache_path(instance, matrix_dir, storage) for instance in instances]
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [[pool.submit(_run_repetition, instance, matrix_path, run_seed(seed, instance, repetition),
+                                    dict(options, trace_path=trace_path(instance, repetition)))
+                        for repetition in range(iterations)]
+                       for instance, matrix_path in zip(instances, matrix_paths)]
+            for instance_futures in futures:
+                yield [future.result() for future in instance_futures]
+
+def _run_repetition(instance, matrix_path, repetition_seed, options):
+    """Worker side of run_repetitions: one seeded solve over the shared distance matrix."""
+    return solve(instance, seed=repetition_seed, distance_matrix=open_distance_matrix(matrix_path), **options)
+
+def parse_sol_file(file_path):
+    """
+    Parse a CVRPLIB solution file.
+
+    Parameters:
+    - file_path (str): Path to the SOL file.
+
+    Returns:
+    - routes (list of lists): Routes with the customers renumbered to the 1-based
+      node indices of the VRP file (the SOL files number customers from 1, depot excluded).
+    - cost (float): The cost written in the file, or None if it is missing.
+    """
+    routes = []
+    cost = None
     with open(file_path, "r") as file:
-        lines = file.readlines()
-        for line in lines:
-                All_Iteration = 0
-                All_Time = 0
-                All_Cost = 0
-                Best_Iteration = 100000000
-                Best_Time = 10000000000000
-                Best_Cost = 10000000000000
-                for i in range(iterations):
-                    line = line.strip()
-                    instance = parse_vrp_file(line)
-                    print(instance)
-                    Cost,Time,Iteration = main_function(instance, lam, Penalidade)
-                    name = instance["name"]
-                    Benchmark = instance["optimal_value"]
-                    All_Iteration += Iteration
-                    All_Time += Time
-                    All_Cost += Cost
-                    if Cost < Best_Cost:
-                        Best_Cost = Cost
-                    if Time < Best_Time:
-                        Best_Time = Time
-                    if Iteration < Best_Iteration:
-                        Best_Iteration = Iteration
-                with open("..\Resultados.txt", 'a', encoding='utf-8') as Output:
-                    Output.write("*************************************************************************************************************\n")
-                    Output.write(f" Nome da Instancia: {name}\n")
-                    Output.write(f"[Melhor Custo: {Best_Cost:.2f} | Media do Custo: {All_Cost/5:.2f} | Melhor Custo Possivel: {Benchmark:.2f}]\n")
-                    Output.write(f"[Melhor Tempo: {Best_Time:.2f} | Media de Tempo: {All_Time/5:.2f}]\n")
-                    Output.write(f"[Melhor Numero de Iterações: {Best_Iteration:.2f} | Media do Numero de Iterações: {All_Iteration/5:.2f}]\n")
-                    Output.write(f"[Melhor Gap: {(Best_Cost - Benchmark) / Benchmark:.5f} | Media da Gap: {((All_Cost / 5) - Benchmark) / Benchmark:.5f}]\n")
-                    Output.write("*************************************************************************************************************\n")
-
-                    print(name)
-
-def main_function(Instance, Lambda, Penalidade):
-
-    distance_matrix = np.zeros((Instance["dimension"] + 1, Instance["dimension"] + 1), dtype=float)
-    for i in range(Instance["dimension"]):
-        for j in range(Instance["dimension"]):
-            distance_matrix[i+1][j+1] = euclidean_distance(Instance["coordinates"][i], Instance["coordinates"][j])      
-    distance_matrix = np.round(distance_matrix, 0)
-    final_solution, time, iteration = guided_local_search(Instance, distance_matrix, Lambda, Penalidade)
-    # plot_grapfh(Instance, distance_matrix, Lambda, Penalidade)
-    Total_Cost = calculate_solution_cost(final_solution, distance_matrix, 1)
-    return Total_Cost, time, iteration 
-
-
-vrp_file_path = "..\Lista de Execucao.txt"
-get_path_instance(vrp_file_path,0.3,1)
+        for line in file:
+            line = line.strip()
+            if line.startswith("Route"):
+                routes.append([int(customer) + 1 for customer in line.split(":")[1].split()])
+            elif line.startswith("Cost"):
+                cost = float(line.split()[1])
+    return routes, cost
+
+def create_distance_matrix(Instance, dtype=DISTANCE_DTYPE):
+    """
+    Builds the EUC_2D distance matrix of an instance with numpy broadcasting, DISTANCE_BLOCK_ROWS
+    rows at a time.
+
+    Distances are rounded to the nearest integer as in TSPLIB (nint(x) = floor(x + 0.5)).
+    EXPLICIT instances copy their edge weights instead.
+
+    Parameters:
+    - Instance (dict): The parsed problem instance.
+    - dtype (numpy dtype, optional): Type of the stored distances (default: DISTANCE_DTYPE).
+
+    Returns:
+    - distance_matrix (2D array): (dimension + 1) x (dimension + 1) matrix indexed by the
+      1-based node numbers, with row and column 0 left at zero.
+    """
+    distance_matrix = np.zeros((Instance["dimension"] + 1, Instance["dimension"] + 1), dtype=dtype)
+    if Instance.get("edge_weights") is not None:
+        distance_matrix[1:, 1:] = Instance["edge_weights"]
+        return distance_matrix
+    if Instance.get("edge_weight_type", "EUC_2D") != "EUC_2D":
+        raise ValueError(f"Unsupported EDGE_WEIGHT_TYPE {Instance['edge_weight_type']} of {Instance['name']}")
+    coordinates = np.asarray(Instance["coordinates"], dtype=float)
+    x = coordinates[:, 0]
+    y = coordinates[:, 1]
+    for start in range(0, len(x), DISTANCE_BLOCK_ROWS):
+        stop = min(start + DISTANCE_BLOCK_ROWS, len(x))
+        distance_matrix[start + 1:stop + 1, 1:] = np.floor(np.hypot(x[start:stop, None] - x[None, :],
+                                                                    y[start:stop, None] - y[None, :]) + 0.5)
+    return distance_matrix
+
+def create_triangular_distance_matrix(Instance, dtype=DISTANCE_DTYPE):
+    """
+    Builds the EUC_2D distance matrix of an instance directly in packed triangular storage,
+    without the dense matrix (see Distance_Matrix.TriangularDistanceMatrix).
+
+    Parameters:
+    - Instance (dict): The parsed problem instance.
+    - dtype (numpy dtype, optional): Type of the stored distances (default: DISTANCE_DTYPE).
+
+    Returns:
+    - distance_matrix (TriangularDistanceMatrix): Same distances as create_distance_matrix.
+    """
+    if Instance.get("edge_weight_type", "EUC_2D") != "EUC_2D":
+        return TriangularDistanceMatrix.pack(create_distance_matrix(Instance, dtype))
+    coordinates = np.asarray(Instance["coordinates"], dtype=float)
+    x = coordinates[:, 0]
+    y = coordinates[:, 1]
+    dimension = Instance["dimension"] + 1
+    values = np.zeros(dimension * (dimension + 1) // 2, dtype=dtype)
+    # Row i (node i, coordinates i - 1) holds the distances to the nodes 1..i after the zero of node 0
+    for i in range(1, dimension):
+        start = i * (i + 1) // 2
+        values[start + 1:start + i + 1] = np.floor(np.hypot(x[:i] - x[i - 1], y[:i] - y[i - 1]) + 0.5)
+    return TriangularDistanceMatrix(values)
+
+def build_distance_matrix(Instance, storage="dense"):
+    """Distance matrix of an instance in the given storage, "dense" or "triangular"."""
+    if storage == "dense":
+        return create_distance_matrix(Instance)
+    if storage == "triangular":
+        return create_triangular_distance_matrix(Instance)
+    raise ValueError(f"Unknown distance storage {storage!r}, expected 'dense' or 'triangular'")
+
+def distance_matrix_cache_path(Instance, cache_dir=DISTANCE_CACHE_DIR, storage="dense"):
+    """
+    Path of the cached distance matrix of an instance, built if it is not in the cache yet.
+
+    The cache key is the name of the instance file, a hash of its content (the "digest" of the
+    parsed instance when present) and DISTANCE_CACHE_VERSION, so an edited file or a new way of computing distances never
+    reads a stale matrix. The file is written under a temporary name and renamed, so
+    concurrent runs never see a partial matrix.
+
+    Parameters:
+    - Instance (dict): The parsed problem instance (with its "file_path").
+    - cache_dir (str, optional): Directory of the cache.
+    - storage (str, optional): "dense" or "triangular", see build_distance_matrix.
+
+    Returns:
+    - path (str): Path of the .npy file holding the distance matrix (open it with open_distance_matrix).
+    """
+    digest = Instance.get("digest")
+    if digest is None:
+        with open(Instance["file_path"], "rb") as file:
+            digest = hashlib.sha1(file.read()).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(Instance["file_path"]))[0]
+    path = os.path.join(cache_dir, f"{name}-{digest}-{storage}-v{DISTANCE_CACHE_VERSION}.npy")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        temporary_path = f"{path[:-len('.npy')]}.{os.getpid()}.tmp.npy"
+        distance_matrix = build_distance_matrix(Instance, storage)
+        np.save(temporary_path, distance_matrix.values if storage == "triangular" else distance_matrix)
+        os.replace(temporary_path, path)
+    return path
+
+def load_distance_matrix(Instance, cache_dir=DISTANCE_CACHE_DIR, storage="dense"):
+    """
+    Distance matrix of an instance through the on-disk cache, opened as a read-only memmap
+    so that repeated runs and parallel workers share one copy of the pages.
+
+    Parameters:
+    - Instance (dict): The parsed problem instance.
+    - cache_dir (str, optional): Directory of the cache; None builds the matrix in memory.
+    - storage (str, optional): "dense" (default) or "triangular" (a quarter of the memory of a
+      float64 matrix, slower scalar reads), see build_distance_matrix. The triangular storage
+      only saves memory with the sparse penalties of guided_local_search (instances from
+      SPARSE_PENALTY_DIMENSION nodes on); the dense penalties expand it back to a dense matrix.
+
+    Returns:
+    - distance_matrix (2D array or TriangularDistanceMatrix): See create_distance_matrix.
+    """
+    if cache_dir is None or Instance.get("file_path") is None:
+        return build_distance_matrix(Instance, storage)
+    return open_distance_matrix(distance_matrix_cache_path(Instance, cache_dir, storage))
+
+def solve(instance, time_limit=300, LAMBDA=0.3, Penalidade=1, granular_k=None, fast_gls=False, construction="random",
+          storage="dense", seed=None, termination=None, initial_solution=None, island_workers=None, profile=False,
+          trace_path=None, checkpoint_path=None, distance_matrix=None, candidate_lists=None, cache_dir=DISTANCE_CACHE_DIR):
+    """
+    Solves one CVRP instance with the GLS: the entry point for other programs.
+
+    Parameters:
+    - instance (dict or str): Parsed instance, or the path of a VRP (or .npz) file, loaded with load_instance.
+    - time_limit (float): Time limit of the search, in seconds.
+    - LAMBDA (float), Penalidade (float): GLS penalty weights.
+    - granular_k (int, optional): Size of the candidate lists of the granular local search.
+    - fast_gls (bool): Don't-look bits in the GLS iterations.
+    - construction (str): Initial solution, see Construction.create_initial_solution.
+    - storage (str): Storage of the distance matrix, see load_distance_matrix.
+    - seed (optional): Seed of the random module for the run (None keeps its current state).
+    - termination (Termination or dict, optional): Early stopping criteria (a dict holds the
+      keyword arguments of Termination).
+    - initial_solution (list of routes, optional): Warm start, e.g. parse_sol_file(...)[0].
+    - island_workers (int, optional): Run the island model with this many processes instead.
+    - profile (bool): Collect a Profiling.SearchProfile, returned as its summary.
+    - trace_path (str, optional): JSONL iteration trace (Trace.TraceWriter), for Grafh.plot_grapfh.
+    - checkpoint_path (str, optional): Periodic checkpoints of the search, resumed from when the file exists.
+    - distance_matrix (2D array, optional): Distance matrix of the instance (default: load_distance_matrix).
+    - candidate_lists (list, optional): Precomputed candidate lists (instead of granular_k).
+    - cache_dir (str, optional): Directory of the instance and distance matrix caches.
 
+    Returns:
+    - result (dict): "name", "cost", "routes" (non-empty routes, 1-based nodes), "time_best",
+      "iteration_best", "stop_reason", "optimal_value", "gap" (to the optimal value, None
+      without one), "elapsed" (seconds) and "profile" (SearchProfile summary, or None).
+    """
+    start_time = timer()
+    if isinstance(instance, str):
+        instance = load_instance(instance, cache_dir)
+    if distance_matrix is None:
+        distance_matrix = load_distance_matrix(instance, cache_dir, storage)
+    if isinstance(termination, dict):
+        termination = Termination(**termination)
+    if seed is not None:
+        random.seed(seed)
+    # Granular mode: only moves creating an edge to one of the granular_k nearest nodes
+    if candidate_lists is None and granular_k:
+        candidate_lists = create_candidate_lists(distance_matrix, granular_k)
+    search_profile = None
+    if island_workers:
+        # Cooperative islands, seeded from the seed of this run (imported here: only this mode needs multiprocessing)
+        from Parallel_Guided_Local_Search import island_guided_local_search
+        final_solution, time_best, iteration_best, stop_reason = island_guided_local_search(instance, distance_matrix, LAMBDA, Penalidade, time_limit,
+                                                                                            workers=island_workers, candidate_lists=candidate_lists,
+                                                                                            fast_gls=fast_gls, seed=random.getrandbits(32),
+                                                                                            termination=termination, construction=construction)
+    else:
+        # Opt-in per-operator profiling
+        search_profile = SearchProfile() if profile else None
+        # Iteration trace for Grafh.plot_grapfh(trace_path, instance["optimal_value"])
+        trace = TraceWriter(trace_path) if trace_path else None
+        try:
+            if checkpoint_path is not None and os.path.exists(checkpoint_path):
+                # Continue the run interrupted after its last checkpoint
+                final_solution, time_best, iteration_best, stop_reason = resume_guided_local_search(instance, distance_matrix, checkpoint_path, time_limit,
+                                                                                                    candidate_lists=candidate_lists, fast_gls=fast_gls,
+                                                                                                    profile=search_profile, observers=[trace] if trace else None,
+                                                                                                    termination=termination)
+            else:
+                # Warm start from initial_solution, periodic checkpoints to checkpoint_path
+                final_solution, time_best, iteration_best, stop_reason = guided_local_search(instance, distance_matrix, LAMBDA, Penalidade, time_limit,
+                                                                                             candidate_lists, fast_gls, profile=search_profile,
+                                                                                             observers=[trace] if trace else None,
+                                                                                             termination=termination, construction=construction,
+                                                                                             initial_solution=initial_solution,
+                                                                                             checkpoint=Checkpointer(checkpoint_path) if checkpoint_path else None)
+        finally:
+            if trace is not None:
+                trace.close()
+    cost = float(calculate_solution_cost(final_solution, distance_matrix, instance["depot"]))
+    optimal_value = instance["optimal_value"]
+    return {"name": instance["name"],
+            "cost": cost,
+            "routes": [[int(customer) for customer in route] for route in final_solution if len(route)],
+            "time_best": time_best,
+            "iteration_best": iteration_best,
+            "stop_reason": stop_reason,
+            "optimal_value": optimal_value,
+            "gap": (cost - optimal_value) / optimal_value if optimal_value else None,
+            "elapsed": timer() - start_time,
+            "profile": search_profile.summary() if search_profile is not None else None}
+
+def main_function(Instance, Lambda, Penalidade, granular_k=None, fast_gls=False, distance_matrix=None, island_workers=None,
+                  profile=False, trace_path=None, termination=None, construction="random", initial_solution=None,
+                  checkpoint_path=None, time_limit=300):
+    """Runs solve with the settings of the batch scripts, printing the profile and early stops; returns (Cost, Time, Iteration)."""
+    result = solve(Instance, time_limit, Lambda, Penalidade, granular_k, fast_gls, construction, termination=termination,
+                   initial_solution=initial_solution, island_workers=island_workers, profile=profile, trace_path=trace_path,
+                   checkpoint_path=checkpoint_path, distance_matrix=distance_matrix)
+    if result["profile"] is not None:
+        print(f"Perfil de {Instance['name']}:\n{SearchProfile.format_summary(result['profile'])}")
+    if result["stop_reason"] != TIME_LIMIT:
+        print(f"{Instance['name']}: parada antecipada ({result['stop_reason']})")
+    return result["cost"], result["time_best"], result["iteration_best"]
+
+def format_results(instances, all_results, output_format="text"):
+    """
+    Results of run_repetitions as text (the summaries of format_summary), JSON (every result of
+    solve, routes included) or CSV (one line per run).
+    """
+    if output_format == "json":
+        return json.dumps([{"instance": instance["name"], "runs": results} for instance, results in zip(instances, all_results)],
+                          indent=1)
+    if output_format == "csv":
+        lines = ["instance,repetition,cost,optimal_value,gap,time_best,iteration_best,stop_reason,elapsed"]
+        for instance, results in zip(instances, all_results):
+            for repetition, result in enumerate(results):
+                lines.append(f"{instance['name']},{repetition},{result['cost']},{result['optimal_value'] or ''},"
+                             f"{result['gap'] if result['gap'] is not None else ''},{result['time_best']:.4f},"
+                             f"{result['iteration_best']},{result['stop_reason']},{result['elapsed']:.4f}")
+        return "\n".join(lines)
+    return "".join(format_summary(instance, results) for instance, results in zip(instances, all_results))
 
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GLS for the CVRP over a list of instances.")
+    parser.add_argument("instances", nargs="*", help="VRP or .npz files, or TXT lists of them (default: Lista de Execucao.txt)")
+    parser.add_argument("--time-limit", type=float, default=300)
+    parser.add_argument("--repetitions", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1, help="processes running the repetitions")
+    parser.add_argument("--island-workers", type=int, default=None, help="run each repetition with the island model")
+    parser.add_argument("--lambda", dest="LAMBDA", type=float, default=0.3)
+    parser.add_argument("--penalidade", type=float, default=1)
+    parser.add_argument("--granular-k", type=int, default=None)
+    parser.add_argument("--fast-gls", action="store_true")
+    parser.add_argument("--construction", default="random")
+    parser.add_argument("--storage", default="dense", choices=["dense", "triangular"],
+                        help="triangular saves memory only on instances large enough for sparse penalties")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--target-gap", type=lambda value: None if value.lower() == "none" else float(value), default=0,
+                        help="stop once within this gap of the optimal value (default: 0, on the optimum; 'none' disables it)")
+    parser.add_argument("--max-iterations", type=int, default=None)
+    parser.add_argument("--stagnation-time", type=float, default=None)
+    parser.add_argument("--format", dest="output_format", default="text", choices=["text", "json", "csv"])
+    parser.add_argument("--output", default=None, help="file written with the results (default: stdout)")
+    parser.add_argument("--trace-dir", default=None, help="directory of the iteration traces")
+    parser.add_argument("--plot", action="store_true", help="plot the first repetition of every instance (needs matplotlib)")
+    args = parser.parse_args()
+    if args.island_workers and args.workers > 1:
+        parser.error("--island-workers runs its own processes, use it with --workers 1")
 
+    paths = []
+    for path in args.instances or [INSTANCE_LIST_PATH]:
+        paths.extend(read_instance_list(path) if path.lower().endswith(".txt") else [path])
+    instances = [load_instance(path) for path in paths]
+    termination = Termination(target_gap=args.target_gap, max_iterations=args.max_iterations, stagnation_time=args.stagnation_time)
 
+    with tempfile.TemporaryDirectory() if args.plot and not args.trace_dir else contextlib.nullcontext(args.trace_dir) as trace_dir:
+        if trace_dir:
+            os.makedirs(trace_dir, exist_ok=True)
+        if args.island_workers:
+            all_results = [[solve(instance, args.time_limit, args.LAMBDA, args.penalidade, args.granular_k, args.fast_gls,
+                                  args.construction, args.storage, run_seed(args.seed, instance, repetition), termination,
+                                  island_workers=args.island_workers)
+                            for repetition in range(args.repetitions)] for instance in instances]
+        else:
+            all_results = list(run_repetitions(instances, args.LAMBDA, args.penalidade, args.repetitions, args.granular_k,
+                                               args.fast_gls, args.workers, args.seed, termination=termination,
+                                               construction=args.construction, storage=args.storage,
+                                               time_limit=args.time_limit, trace_dir=trace_dir))
+        output = format_results(instances, all_results, args.output_format)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as file:
+                file.write(output)
+        else:
+            print(output)
+        if args.plot and not args.island_workers:
+            # matplotlib is only imported when a plot is asked for
+            from Grafh import plot_grapfh
+            for instance in instances:
+                plot_grapfh(os.path.join(trace_dir, f"{instance['name']}-0.jsonl"), instance["optimal_value"], instance["name"])
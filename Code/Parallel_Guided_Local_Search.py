@@ -0,0 +1,163 @@
+import copy
+import numpy as np
+import os
+import random
+import tempfile
+import time
+import multiprocessing
+import multiprocessing.synchronize
+from Utilities import calculate_solution_cost
+from Guided_Local_Search import guided_local_search, apply_gls_penalty, LOCAL_OPTIMUM_MEMO_SIZE
+from Distance_Matrix import TriangularDistanceMatrix, open_distance_matrix
+from Local_Search import TWO_OPT_MEMO_SIZE
+
+# Shared state of the island model, set in every worker by _init_island
+_island = {}
+
+
+def encode_solution(solution):
+    """Giant tour of a solution with 0 between consecutive routes (fixed length for a given instance)."""
+    tour = []
+    for vehicle, route in enumerate(solution):
+        if vehicle > 0:
+            tour.append(0)
+        tour.extend(route)
+    return tour
+
+def decode_solution(tour):
+    """Inverse of encode_solution."""
+    solution = [[]]
+    for node in tour:
+        if node == 0:
+            solution.append([])
+        else:
+            solution[-1].append(int(node))
+    return solution
+
+def _init_island(lock, best_cost, best_tour, penalty_slots, dimension, workers, stop_event):
+    """Pool initializer: keeps numpy views over the shared arrays of the island model, and its stop event."""
+    _island["lock"] = lock
+    _island["stop_event"] = stop_event
+    _island["best_cost"] = best_cost
+    _island["best_tour"] = np.frombuffer(best_tour, dtype=np.int32)
+    if penalty_slots is not None:
+        _island["penalties"] = np.frombuffer(penalty_slots, dtype=float).reshape(workers, dimension + 1, dimension + 1)
+    else:
+        _island["penalties"] = None
+
+def _island_worker(worker_id, Instance, matrix_path, LAMBDA, Penalidade, time_limit, sync_interval,
+                   stagnation_syncs, candidate_lists, fast_gls, seed, termination, construction):
+    """One island: a GLS whose sync hook exchanges the best solution (and the penalties) through shared memory."""
+    random.seed(f"{seed}:island:{worker_id}")
+    distance_matrix = open_distance_matrix(matrix_path)
+    shared_penalties = _island["penalties"]
+    if _island["stop_event"] is not None:
+        # The event cannot travel with the task, it was inherited by the worker
+        termination = copy.copy(termination)
+        termination.stop_event = _island["stop_event"]
+    state = {"next_sync": time.time() + sync_interval, "best_seen": float("inf"), "stagnant_syncs": 0}
+
+    def sync(solution, Best_Solution, Best_Cost, penalties, penalyzed_distance_matrix, penalyzed_cost_lists):
+        now = time.time()
+        if now < state["next_sync"]:
+            return None
+        state["next_sync"] = now + sync_interval
+
+        with _island["lock"]:
+            if Best_Cost < _island["best_cost"].value:
+                _island["best_cost"].value = Best_Cost
+                _island["best_tour"][:] = encode_solution(Best_Solution)
+            global_cost = _island["best_cost"].value
+            global_tour = _island["best_tour"].tolist()
+            if shared_penalties is not None:
+                shared_penalties[worker_id] = penalties
+                mean_penalties = shared_penalties.mean(axis=0)
+
+        if shared_penalties is not None:
+            penalties[:] = mean_penalties
+            apply_gls_penalty(distance_matrix, penalties, LAMBDA, Penalidade, out=penalyzed_distance_matrix)
+            penalyzed_cost_lists[:] = penalyzed_distance_matrix.tolist()
+
+        # Restart from the global best, keeping this island's penalties, after stagnating for a few syncs
+        if Best_Cost < state["best_seen"]:
+            state["best_seen"] = Best_Cost
+            state["stagnant_syncs"] = 0
+            return None
+        state["stagnant_syncs"] += 1
+        if state["stagnant_syncs"] >= stagnation_syncs and global_cost < Best_Cost:
+            state["stagnant_syncs"] = 0
+            return decode_solution(global_tour)
+        return None
+
+    Best_Solution, time_best, Iteration_best, stop_reason = guided_local_search(Instance, distance_matrix, LAMBDA, Penalidade, time_limit,
+                                                                                candidate_lists, fast_gls, sync,
+                                                                                termination=termination, construction=construction,
+                                                                                sparse_penalties=False if shared_penalties is not None else None,
+                                                                                two_opt_memo_size=0 if shared_penalties is not None else TWO_OPT_MEMO_SIZE,
+                                                                                optimum_memo_size=0 if shared_penalties is not None else LOCAL_OPTIMUM_MEMO_SIZE)
+    Best_Cost = calculate_solution_cost(Best_Solution, distance_matrix, Instance["depot"])
+    return Best_Cost, Best_Solution, time_best, Iteration_best, stop_reason
+
+def island_guided_local_search(Instance, distance_matrix, LAMBDA, Penalidade, time_limit=300, workers=4, sync_interval=5.0,
+                               stagnation_syncs=3, share_penalties=False, candidate_lists=None, fast_gls=False, seed=0,
+                               termination=None, construction="random"):
+    """
+    Cooperative island-model GLS: `workers` searches run in separate processes and meet every
+    sync_interval seconds through shared memory.
+
+    At each sync an island publishes its best solution if it beats the global best. An island
+    whose best did not improve over stagnation_syncs consecutive syncs restarts from the global
+    best, keeping its own penalties. With share_penalties the islands also publish their penalty
+    matrices and continue from the mean of all of them (one (n+1)² slot per island, so the
+    islands then keep dense penalties whatever the size of the instance, and no two-opt or local-optimum memo).
+
+    Parameters:
+    - Instance (dict), distance_matrix (2D array), LAMBDA (float), Penalidade (float),
+      candidate_lists (list), fast_gls (bool): See guided_local_search.
+    - time_limit (float): Wall-clock time of each island, in seconds.
+    - workers (int): Number of islands (processes).
+    - sync_interval (float): Seconds between two syncs of an island.
+    - stagnation_syncs (int): Syncs without improvement before an island restarts from the global best.
+    - share_penalties (bool): Exchange the penalty matrices as well.
+    - seed (int): Base seed; island i is seeded with f"{seed}:island:{i}".
+    - termination (Termination): Stopping criteria of every island (each island checks them on its
+      own search). Its stop_event must be a multiprocessing.Event: it is handed to the workers
+      when the pool starts, and setting it stops every island.
+    - construction (str): Construction method of the initial solution of every island, see guided_local_search.
+
+    Returns:
+    - Best_Solution (list of lists), time_best (float), Iteration_best (int), stop_reason (str): Those of the best island.
+
+    Raises:
+    - TypeError: If termination has a stop_event that is not a multiprocessing.Event.
+    """
+    stop_event = termination.stop_event if termination is not None else None
+    if stop_event is not None:
+        if not isinstance(stop_event, multiprocessing.synchronize.Event):
+            raise TypeError(f"The islands need a multiprocessing.Event as stop_event, got {type(stop_event).__name__}")
+        # Sent to the workers through the pool initializer, the tasks carry the other criteria
+        termination = copy.copy(termination)
+        termination.stop_event = None
+    dimension = Instance["dimension"]
+    lock = multiprocessing.Lock()
+    best_cost = multiprocessing.RawValue("d", float("inf"))
+    best_tour = multiprocessing.RawArray("i", dimension - 1 + Instance["num_vehicles"] - 1)
+    penalty_slots = multiprocessing.RawArray("d", workers * (dimension + 1) ** 2) if share_penalties else None
+
+    with tempfile.TemporaryDirectory() as matrix_dir:
+        # A matrix opened from the distance cache is shared as is, anything else through a temporary file
+        stored = distance_matrix.values if isinstance(distance_matrix, TriangularDistanceMatrix) else distance_matrix
+        if isinstance(stored, np.memmap) and stored.filename:
+            matrix_path = stored.filename
+        else:
+            matrix_path = os.path.join(matrix_dir, "distance_matrix.npy")
+            np.save(matrix_path, np.asarray(stored))
+
+        with multiprocessing.Pool(workers, initializer=_init_island,
+                                  initargs=(lock, best_cost, best_tour, penalty_slots, dimension, workers, stop_event)) as pool:
+            results = pool.starmap(_island_worker, [(worker_id, Instance, matrix_path, LAMBDA, Penalidade, time_limit, sync_interval,
+                                                     stagnation_syncs, candidate_lists, fast_gls, seed, termination, construction)
+                                                    for worker_id in range(workers)])
+
+    Best_Cost, Best_Solution, time_best, Iteration_best, stop_reason = min(results, key=lambda result: result[0])
+    return Best_Solution, time_best, Iteration_best, stop_reason
@@ -0,0 +1,71 @@
+import time
+
+
+class SearchProfile:
+    """
+    Opt-in instrumentation of guided_local_search and local_search.
+
+    Per operator (two_opt, relocate, exchange, cross) it counts the moves evaluated (the moves
+    whose cost change was computed, after the capacity and granular filters), the moves applied and their cumulative gain (on the matrix searched, penalized inside GLS).
+    Per phase it accumulates wall-clock time through lap(): each call charges the time since
+    the previous lap to the named phase. The searches only touch the profile behind
+    `if profile is not None`, so a disabled profile costs a comparison per phase.
+    """
+    __slots__ = ("considered", "applied", "gain", "phase_time", "iterations", "elapsed", "local_optima", "_last_lap")
+
+    OPERATORS = ("two_opt", "relocate", "exchange", "cross")
+
+    def __init__(self):
+        self.considered = dict.fromkeys(self.OPERATORS, 0)
+        self.applied = dict.fromkeys(self.OPERATORS, 0)
+        self.gain = dict.fromkeys(self.OPERATORS, 0.0)
+        self.phase_time = {}
+        self.iterations = 0
+        self.elapsed = 0.0
+        # Revisit statistics of the local optima (Guided_Local_Search.LocalOptimumMemo.summary)
+        self.local_optima = None
+        self._last_lap = time.perf_counter()
+
+    def lap(self, phase=None):
+        """Charges the time since the previous lap to phase (None only restarts the clock)."""
+        now = time.perf_counter()
+        if phase is not None:
+            self.phase_time[phase] = self.phase_time.get(phase, 0.0) + now - self._last_lap
+        self._last_lap = now
+
+    def record_move(self, operator, gain):
+        """Counts one applied move of an operator and its gain."""
+        self.applied[operator] += 1
+        self.gain[operator] += gain
+
+    def summary(self):
+        """Counters, phase times and iteration rate of the run as a dict."""
+        return {"iterations": self.iterations,
+                "elapsed": self.elapsed,
+                "iterations_per_second": self.iterations / self.elapsed if self.elapsed > 0 else 0.0,
+                "operators": {operator: {"considered": self.considered[operator], "applied": self.applied[operator],
+                                         "gain": self.gain[operator]} for operator in self.OPERATORS},
+                "phases": dict(sorted(self.phase_time.items(), key=lambda item: -item[1])),
+                "local_optima": self.local_optima}
+
+    def report(self):
+        """Human-readable summary of the run."""
+        return self.format_summary(self.summary())
+
+    @staticmethod
+    def format_summary(summary):
+        """Human-readable text of a summary (e.g. one returned by another process)."""
+        lines = [f"Iteracoes: {summary['iterations']} | Tempo: {summary['elapsed']:.2f}s | "
+                 f"Iteracoes/s: {summary['iterations_per_second']:.1f}"]
+        for operator, counters in summary["operators"].items():
+            lines.append(f"  {operator:<9} avaliados: {counters['considered']:>12} | aplicados: {counters['applied']:>8} | "
+                         f"ganho: {counters['gain']:12.2f}")
+        total = sum(summary["phases"].values()) or 1.0
+        for phase, seconds in summary["phases"].items():
+            lines.append(f"  {phase:<24} {seconds:9.3f}s ({seconds / total:6.1%})")
+        if summary["local_optima"] is not None:
+            optima = summary["local_optima"]
+            lines.append(f"  Otimos locais: {optima['landings']} | distintos: {optima['distinct']} | "
+                         f"revisitas: {optima['revisits']} ({optima['revisit_rate']:.1%}) | max. visitas: {optima['most_visits']} | "
+                         f"reverificados: {optima['rechecks']} | certificados: {optima['certified']}")
+        return "\n".join(lines)
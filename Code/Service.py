@@ -0,0 +1,282 @@
+import argparse
+import itertools
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from Local_Search import create_candidate_lists
+from Main import solve, load_instance, load_distance_matrix, DISTANCE_CACHE_DIR
+
+# Instances (with their distance matrix and candidate lists) kept warm by every worker
+SERVICE_CACHE_SIZE = 32
+
+# Per-process LRU of (instance, distance matrix, {granular_k: candidate lists}), keyed by path and storage
+_warm_instances = OrderedDict()
+
+
+def _warm_instance(path, storage, cache_dir):
+    """Instance, distance matrix and candidate lists cache of a worker, loaded on first use."""
+    key = (os.path.abspath(path), os.path.getmtime(path), storage)
+    if key in _warm_instances:
+        _warm_instances.move_to_end(key)
+    else:
+        instance = load_instance(path, cache_dir)
+        _warm_instances[key] = (instance, load_distance_matrix(instance, cache_dir, storage), {})
+        if len(_warm_instances) > SERVICE_CACHE_SIZE:
+            _warm_instances.popitem(last=False)
+    return _warm_instances[key]
+
+def solve_request(request, cache_dir=DISTANCE_CACHE_DIR):
+    """
+    Runs one solve request of the service (in a worker of its pool).
+
+    Parameters:
+    - request (dict): "instance" (VRP or .npz path) and optionally "time_limit" (seconds,
+      default 10), "LAMBDA" (0.3), "Penalidade" (1), "granular_k", "fast_gls", "construction",
+      "storage", "seed", "initial_solution" (routes) and "termination" (keyword arguments of
+      Termination.Termination, e.g. {"target_gap": 0, "stagnation_time": 2}).
+    - cache_dir (str, optional): Directory of the instance and distance matrix caches.
+
+    Returns:
+    - response (dict): "id" of the request, "cost", "routes", "time_best", "iteration_best",
+      "stop_reason" and "elapsed" (seconds spent in the worker, instance loading included).
+    """
+    start_time = time.perf_counter()
+    instance, distance_matrix, candidate_cache = _warm_instance(request["instance"], request.get("storage", "dense"), cache_dir)
+    granular_k = request.get("granular_k")
+    if granular_k and granular_k not in candidate_cache:
+        candidate_cache[granular_k] = create_candidate_lists(distance_matrix, granular_k)
+    result = solve(instance, request.get("time_limit", 10), request.get("LAMBDA", 0.3), request.get("Penalidade", 1),
+                   fast_gls=request.get("fast_gls", False), construction=request.get("construction", "random"),
+                   seed=request.get("seed"), termination=request.get("termination") or None,
+                   initial_solution=request.get("initial_solution"), distance_matrix=distance_matrix,
+                   candidate_lists=candidate_cache.get(granular_k) if granular_k else None)
+    return {"id": request.get("id"),
+            "cost": result["cost"],
+            "routes": result["routes"],
+            "time_best": result["time_best"],
+            "iteration_best": result["iteration_best"],
+            "stop_reason": result["stop_reason"],
+            "elapsed": time.perf_counter() - start_time}
+
+def _warm_up():
+    """No-op task that makes the pool start a worker (the modules are imported by then)."""
+    return os.getpid()
+
+
+class SolverService:
+    """
+    Long-running solver: a warm process pool and a fair queue of solve requests.
+
+    The workers are started (and have imported the solver) before the first request, and each
+    keeps an LRU of SERVICE_CACHE_SIZE instances with their distance matrix (a memmap of the
+    on-disk cache, so its pages are shared by the workers) and candidate lists, so a request
+    for a known instance goes straight to guided_local_search. Requests wait in one FIFO queue
+    per client and are handed to the pool round-robin over the clients, at most one per free
+    worker, so a client sending a burst of requests does not delay the others behind all of it.
+    If a worker dies (killed, out of memory), the requests it broke are answered with an error
+    and the pool is replaced by a fresh one, so the service keeps answering.
+    """
+
+    def __init__(self, workers=os.cpu_count(), cache_dir=DISTANCE_CACHE_DIR):
+        """
+        Parameters:
+        - workers (int): Number of worker processes (and of requests solved at once).
+        - cache_dir (str, optional): Directory of the instance and distance matrix caches.
+        """
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        for future in [self.pool.submit(_warm_up) for _ in range(workers)]:
+            future.result()
+        self.queues = OrderedDict()
+        self.in_flight = 0
+        self.solved = 0
+        self.restarts = 0
+        self.condition = threading.Condition()
+        self.closed = False
+        self.dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self.dispatcher.start()
+
+    def submit(self, client, request, reply):
+        """Queues a solve request of a client; reply(response) is called from another thread when it is done."""
+        with self.condition:
+            self.queues.setdefault(client, deque()).append((request, reply))
+            self.condition.notify_all()
+
+    def stats(self):
+        """Queue and pool counters."""
+        with self.condition:
+            return {"workers": self.workers, "in_flight": self.in_flight, "solved": self.solved, "restarts": self.restarts,
+                    "queued": {str(client): len(queue) for client, queue in self.queues.items()}}
+
+    def _dispatch(self):
+        while True:
+            with self.condition:
+                while not self.closed and (self.in_flight >= self.workers or not self.queues):
+                    self.condition.wait()
+                if self.closed:
+                    return
+                # Round-robin: the client served goes to the back of the order
+                client, queue = next(iter(self.queues.items()))
+                request, reply = queue.popleft()
+                del self.queues[client]
+                if queue:
+                    self.queues[client] = queue
+                self.in_flight += 1
+                pool = self.pool
+            try:
+                future = pool.submit(solve_request, request, self.cache_dir)
+            except Exception as error:
+                if isinstance(error, BrokenProcessPool):
+                    self._restart_pool(pool)
+                self._respond(request, reply, {"id": request.get("id"), "error": f"{type(error).__name__}: {error}"})
+                continue
+            future.add_done_callback(lambda done, request=request, reply=reply, pool=pool: self._finish(done, request, reply, pool))
+
+    def _restart_pool(self, broken):
+        """Replaces a pool broken by the death of a worker (once, however many requests it failed)."""
+        with self.condition:
+            if self.pool is not broken or self.closed:
+                return
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            self.restarts += 1
+            # Start the new workers without waiting for them
+            for _ in range(self.workers):
+                self.pool.submit(_warm_up)
+        broken.shutdown(wait=False)
+
+    def _finish(self, future, request, reply, pool):
+        try:
+            response = future.result()
+        except Exception as error:
+            if isinstance(error, BrokenProcessPool):
+                self._restart_pool(pool)
+            response = {"id": request.get("id"), "error": f"{type(error).__name__}: {error}"}
+        self._respond(request, reply, response)
+
+    def _respond(self, request, reply, response):
+        # Answer before freeing the slot, so that wait_idle returns only once every response is out
+        try:
+            reply(response)
+        finally:
+            with self.condition:
+                self.in_flight -= 1
+                self.solved += 1
+                self.condition.notify_all()
+
+    def handle(self, client, line, reply):
+        """
+        Handles one line of the JSON protocol: a solve request (see solve_request; "client"
+        overrides the client it is queued for), {"op": "stats"} or {"op": "ping"}.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            reply({"error": f"Invalid JSON: {error}"})
+            return
+        op = request.get("op", "solve")
+        if op == "ping":
+            reply({"id": request.get("id"), "pong": True})
+        elif op == "stats":
+            reply(dict(self.stats(), id=request.get("id")))
+        elif op == "solve" and "instance" in request:
+            self.submit(request.get("client", client), request, reply)
+        else:
+            reply({"id": request.get("id"), "error": f"Invalid request {line.strip()!r}"})
+
+    def close(self):
+        """Stops dispatching and shuts the pool down once the running requests are done."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+            pool = self.pool
+        pool.shutdown(wait=True)
+
+    def wait_idle(self):
+        """Blocks until every queued request has been answered."""
+        with self.condition:
+            while self.in_flight or self.queues:
+                self.condition.wait()
+
+
+def serve_stdio(service, input_stream=sys.stdin, output_stream=sys.stdout):
+    """
+    JSON lines over stdin/stdout: one request per input line, one response per output line,
+    written as the requests finish (match them by "id"). Returns at the end of the input,
+    once every request has been answered.
+    """
+    lock = threading.Lock()
+
+    def reply(response):
+        with lock:
+            output_stream.write(json.dumps(response) + "\n")
+            output_stream.flush()
+
+    for line in input_stream:
+        if line.strip():
+            service.handle("stdin", line, reply)
+    service.wait_idle()
+
+def serve_socket(service, path):
+    """
+    JSON lines over a Unix socket: every connection is a client of the fair queue, with the
+    protocol of serve_stdio. Runs until interrupted.
+    """
+    connection_ids = itertools.count()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            client = f"connection-{next(connection_ids)}"
+            lock = threading.Lock()
+            pending = threading.Semaphore(0)
+            count = 0
+
+            def reply(response):
+                with lock:
+                    try:
+                        self.wfile.write((json.dumps(response) + "\n").encode())
+                        self.wfile.flush()
+                    except OSError:
+                        pass
+                pending.release()
+
+            for line in self.rfile:
+                if line.strip():
+                    count += 1
+                    service.handle(client, line.decode(), reply)
+            # Keep the connection open until its last response is written
+            for _ in range(count):
+                pending.acquire()
+
+    if os.path.exists(path):
+        os.remove(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        server.daemon_threads = True
+        try:
+            server.serve_forever()
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm GLS solver service (JSON lines over stdin/stdout or a Unix socket).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--socket", default=None, help="path of a Unix socket to listen on (default: stdin/stdout)")
+    args = parser.parse_args()
+
+    service = SolverService(args.workers)
+    try:
+        if args.socket:
+            serve_socket(service, args.socket)
+        else:
+            serve_stdio(service)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
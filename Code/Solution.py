@@ -0,0 +1,87 @@
+from Utilities import calculate_route_cost, calculate_prefix_loads
+
+
+class Solution:
+    """
+    Routes of a CVRP solution together with the metadata of every route.
+
+    For each route it keeps the cost (measured with the matrix the solution was built with),
+    the load and the prefix loads, plus a customer -> (vehicle, index) map. Moves go through
+    apply_move / set_route, which refresh only the routes they touch. The object iterates,
+    indexes and measures like the plain list of routes, so the helpers of Utilities accept it
+    unchanged.
+    """
+    __slots__ = ("routes", "route_costs", "loads", "prefix_loads", "positions", "cost_matrix", "demands", "depot")
+
+    def __init__(self, routes, cost_matrix, demands, depot):
+        """
+        Parameters:
+        - routes (iterable of lists): Routes of the solution (copied).
+        - cost_matrix (2D list): Matrix used for the route costs (plain lists index fastest).
+        - demands (list): demands[i - 1] is the demand of customer i.
+        - depot (int): Index of the depot.
+        """
+        self.routes = [list(route) for route in routes]
+        self.cost_matrix = cost_matrix
+        self.demands = demands
+        self.depot = depot
+        self.route_costs = [0] * len(self.routes)
+        self.loads = [0] * len(self.routes)
+        self.prefix_loads = [None] * len(self.routes)
+        self.positions = {}
+        for vehicle in range(len(self.routes)):
+            self.refresh_route(vehicle)
+
+    def refresh_route(self, vehicle):
+        """Recomputes the cost, loads and customer positions of one route."""
+        route = self.routes[vehicle]
+        self.route_costs[vehicle] = calculate_route_cost(route, self.cost_matrix, self.depot)
+        self.prefix_loads[vehicle] = calculate_prefix_loads(route, self.demands)
+        self.loads[vehicle] = self.prefix_loads[vehicle][-1]
+        for index, customer in enumerate(route):
+            self.positions[customer] = (vehicle, index)
+
+    def apply_move(self, operator, vehicle, index1, other_vehicle, index2):
+        """Applies a two-route operator of Local_Search (relocate, exchange, cross) and refreshes both routes."""
+        operator(self.routes, vehicle, index1, other_vehicle, index2)
+        self.refresh_route(vehicle)
+        self.refresh_route(other_vehicle)
+
+    def set_route(self, vehicle, route):
+        """Replaces one route (e.g. by its two-opt improvement) and refreshes it."""
+        self.routes[vehicle] = route
+        self.refresh_route(vehicle)
+
+    @property
+    def cost(self):
+        """Total cost, with the matrix the solution was built with."""
+        return sum(self.route_costs)
+
+    def copy(self):
+        """Cheap snapshot: new route lists and metadata containers, sharing the immutable prefix lists and the matrix."""
+        snapshot = Solution.__new__(Solution)
+        snapshot.routes = [route[:] for route in self.routes]
+        snapshot.route_costs = self.route_costs[:]
+        snapshot.loads = self.loads[:]
+        snapshot.prefix_loads = self.prefix_loads[:]
+        snapshot.positions = dict(self.positions)
+        snapshot.cost_matrix = self.cost_matrix
+        snapshot.demands = self.demands
+        snapshot.depot = self.depot
+        return snapshot
+
+    def to_list(self):
+        """The routes as a plain list of lists."""
+        return [route[:] for route in self.routes]
+
+    def __len__(self):
+        return len(self.routes)
+
+    def __getitem__(self, vehicle):
+        return self.routes[vehicle]
+
+    def __iter__(self):
+        return iter(self.routes)
+
+    def __repr__(self):
+        return f"Solution({self.routes!r})"
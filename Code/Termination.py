@@ -0,0 +1,68 @@
+TIME_LIMIT = "time_limit"
+TARGET = "target"
+MAX_ITERATIONS = "max_iterations"
+STAGNATION_ITERATIONS = "stagnation_iterations"
+STAGNATION_TIME = "stagnation_time"
+STOPPED = "stopped"
+
+
+class Termination:
+    """
+    Stopping criteria of guided_local_search, on top of its time_limit.
+
+    Every criterion left as None is disabled; the others combine, the first one met stopping
+    the search. guided_local_search checks them before each iteration and returns the name of
+    the criterion that stopped it (one of the constants of this module, TIME_LIMIT when only
+    the time limit was reached).
+    """
+
+    def __init__(self, target_cost=None, target_gap=None, max_iterations=None, stagnation_iterations=None,
+                 stagnation_time=None, stop_event=None):
+        """
+        Parameters:
+        - target_cost (float): Stop once the best cost is at most target_cost.
+        - target_gap (float): Stop once the best cost is within target_gap of the optimal value
+          of the instance (0 stops on the optimum, 0.01 within 1%); ignored without an optimal value.
+        - max_iterations (int): Stop after this many GLS iterations.
+        - stagnation_iterations (int): Stop after this many iterations without improving the best.
+        - stagnation_time (float): Stop after this many seconds without improving the best.
+        - stop_event (threading.Event or similar): Stop as soon as stop_event.is_set() (an external signal).
+        """
+        self.target_cost = target_cost
+        self.target_gap = target_gap
+        self.max_iterations = max_iterations
+        self.stagnation_iterations = stagnation_iterations
+        self.stagnation_time = stagnation_time
+        self.stop_event = stop_event
+
+    def target_for(self, Instance):
+        """Cost that stops the search on an instance (the first one reached of target_cost and target_gap), or None."""
+        targets = []
+        if self.target_cost is not None:
+            targets.append(self.target_cost)
+        if self.target_gap is not None and Instance.get("optimal_value") is not None:
+            targets.append(Instance["optimal_value"] * (1 + self.target_gap))
+        return max(targets) if targets else None
+
+    def check(self, target, Best_Cost, Iterations, elapsed, Iteration_best, time_best):
+        """
+        Parameters:
+        - target (float): Result of target_for for the instance searched.
+        - Best_Cost (float): Best cost so far.
+        - Iterations (int), elapsed (float): Iterations done and seconds spent so far.
+        - Iteration_best (int), time_best (float): Iteration and time of the last improvement.
+
+        Returns:
+        - str: The criterion met, or None to continue.
+        """
+        if self.stop_event is not None and self.stop_event.is_set():
+            return STOPPED
+        if target is not None and Best_Cost <= target + 1e-9:
+            return TARGET
+        if self.max_iterations is not None and Iterations >= self.max_iterations:
+            return MAX_ITERATIONS
+        if self.stagnation_iterations is not None and Iterations - Iteration_best >= self.stagnation_iterations:
+            return STAGNATION_ITERATIONS
+        if self.stagnation_time is not None and elapsed - time_best >= self.stagnation_time:
+            return STAGNATION_TIME
+        return None
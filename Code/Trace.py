@@ -0,0 +1,62 @@
+import json
+
+
+class TraceWriter:
+    """
+    Observer of guided_local_search that streams the iteration events to a JSONL file
+    (one JSON object per line).
+
+    Events are serialized as they arrive and written in blocks of buffer_events lines, so the
+    memory used is constant whatever the length of the run and the solver pays one json.dumps
+    per iteration. Use it as a context manager (or call close()) so the last block is written.
+    """
+
+    def __init__(self, path, buffer_events=256):
+        """
+        Parameters:
+        - path (str): JSONL file to write (overwritten).
+        - buffer_events (int): Number of events kept in memory between two writes.
+        """
+        self.path = path
+        self.buffer_events = buffer_events
+        self.buffer = []
+        self.file = open(path, "w", encoding="utf-8")
+
+    def __call__(self, event):
+        self.buffer.append(json.dumps(event, separators=(",", ":")))
+        if len(self.buffer) >= self.buffer_events:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered events to the file."""
+        if self.buffer:
+            self.file.write("\n".join(self.buffer) + "\n")
+            self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_trace(path):
+    """
+    Reads a trace written by TraceWriter, one event at a time.
+
+    Parameters:
+    - path (str): JSONL trace file.
+
+    Returns:
+    - generator of dict: The events, in iteration order.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,153 @@
+import argparse
+import contextlib
+import itertools
+import json
+import math
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from Utilities import calculate_solution_cost
+from Local_Search import create_candidate_lists
+from Guided_Local_Search import guided_local_search
+from Distance_Matrix import open_distance_matrix
+from Main import load_instance, read_instance_list, distance_matrix_cache_path, run_seed, DISTANCE_CACHE_DIR
+
+
+def parse_values(spec):
+    """
+    Values of a tuning parameter from a command-line spec: "0.1,0.2,0.3" (a list) or
+    "0.1:0.5:0.1" (start:stop:step, stop included).
+    """
+    if ":" in spec:
+        start, stop, step = (float(part) for part in spec.split(":"))
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        return [round(start + index * step, 10) for index in range(count)]
+    return [float(value) for value in spec.split(",")]
+
+def parameter_grid(lambdas, penalidades):
+    """Every (LAMBDA, Penalidade) configuration of the grid, as dicts."""
+    return [{"LAMBDA": LAMBDA, "Penalidade": Penalidade} for LAMBDA, Penalidade in itertools.product(lambdas, penalidades)]
+
+def tune_parameters(instances, configurations, min_time=2.0, max_time=32.0, eta=2, repetitions=1, workers=1, seed=0,
+                    granular_k=None, fast_gls=False, construction="random", cache_dir=DISTANCE_CACHE_DIR, output_path=None):
+    """
+    Races GLS configurations with successive halving.
+
+    Every round runs each surviving configuration on every instance (repetitions seeded runs
+    each, the same seeds for every configuration) with the time budget of the round, then keeps
+    the best 1/eta of them by mean gap. The budget starts at min_time and is multiplied by eta
+    each round, so most of the time goes to the promising settings; the race ends when one
+    configuration is left or the next budget would exceed max_time. The gap of a run is taken to
+    the optimal value of its instance, or to the best cost of the round when it has none.
+
+    The runs of a round are spread over a process pool that opens the distance matrices from
+    the on-disk cache (see Main.run_repetitions).
+
+    Parameters:
+    - instances (list of dicts): Parsed instances.
+    - configurations (list of dicts): {"LAMBDA": ..., "Penalidade": ...} settings, e.g. from parameter_grid.
+    - min_time (float), max_time (float): Budget of the first round and cap of the budgets, in seconds.
+    - eta (int): Budget growth and elimination ratio of the rounds (2 keeps half of them).
+    - repetitions (int): Runs of each configuration per instance and round.
+    - workers (int): Number of processes (1 runs serially).
+    - seed (int): Base seed, see Main.run_seed.
+    - granular_k, fast_gls, construction: GLS settings, see Main.solve.
+    - cache_dir (str, optional): Directory of the distance matrix cache (None uses a temporary one).
+    - output_path (str, optional): JSON file written with the ranking.
+
+    Returns:
+    - ranking (list of dicts): One row per configuration, best first: its settings, the number
+      of rounds it raced, the budget and mean/best gap of its last round.
+    """
+    rows = [dict(configuration, rounds=0, time_limit=None, mean_gap=None, best_gap=None) for configuration in configurations]
+    survivors = list(range(len(rows)))
+    budget = min_time
+
+    with tempfile.TemporaryDirectory() if cache_dir is None else contextlib.nullcontext(cache_dir) as matrix_dir:
+        matrix_paths = [distance_matrix_cache_path(instance, matrix_dir) for instance in instances]
+        with ProcessPoolExecutor(max_workers=workers) if workers > 1 else contextlib.nullcontext() as pool:
+            while survivors:
+                tasks = [(index, instance_index, repetition) for index in survivors
+                         for instance_index in range(len(instances)) for repetition in range(repetitions)]
+                arguments = [(instances[instance_index], matrix_paths[instance_index], rows[index]["LAMBDA"],
+                              rows[index]["Penalidade"], budget, granular_k, fast_gls, construction,
+                              run_seed(seed, instances[instance_index], repetition))
+                             for index, instance_index, repetition in tasks]
+                if pool is None:
+                    costs = [_tuning_run(*task_arguments) for task_arguments in arguments]
+                else:
+                    costs = [future.result() for future in [pool.submit(_tuning_run, *task_arguments) for task_arguments in arguments]]
+
+                references = []
+                for instance_index, instance in enumerate(instances):
+                    best_found = min(cost for (_, task_instance, _), cost in zip(tasks, costs) if task_instance == instance_index)
+                    references.append(instance["optimal_value"] or best_found)
+                gaps = {index: [] for index in survivors}
+                for (index, instance_index, _), cost in zip(tasks, costs):
+                    gaps[index].append((cost - references[instance_index]) / references[instance_index])
+                for index in survivors:
+                    rows[index].update(rounds=rows[index]["rounds"] + 1, time_limit=budget,
+                                       mean_gap=sum(gaps[index]) / len(gaps[index]), best_gap=min(gaps[index]))
+
+                survivors.sort(key=lambda index: rows[index]["mean_gap"])
+                print(f"Rodada {rows[survivors[0]]['rounds']} ({budget:.1f}s): {len(survivors)} configuracoes | "
+                      f"melhor LAMBDA {rows[survivors[0]]['LAMBDA']} Penalidade {rows[survivors[0]]['Penalidade']} "
+                      f"gap medio {rows[survivors[0]]['mean_gap']:.5f}")
+                if len(survivors) == 1 or budget * eta > max_time:
+                    break
+                survivors = survivors[:max(1, math.ceil(len(survivors) / eta))]
+                budget *= eta
+
+    ranking = sorted(rows, key=lambda row: (-row["rounds"], row["mean_gap"]))
+    if output_path is not None:
+        settings = {"instances": [instance["name"] for instance in instances], "min_time": min_time, "max_time": max_time,
+                    "eta": eta, "repetitions": repetitions, "seed": seed, "granular_k": granular_k, "fast_gls": fast_gls,
+                    "construction": construction}
+        with open(output_path, "w", encoding="utf-8") as output:
+            json.dump({"settings": settings, "ranking": ranking}, output, indent=1)
+    return ranking
+
+def _tuning_run(instance, matrix_path, LAMBDA, Penalidade, time_limit, granular_k, fast_gls, construction, run_seed_value):
+    """One seeded GLS run of tune_parameters over the shared distance matrix; returns its cost."""
+    random.seed(run_seed_value)
+    distance_matrix = open_distance_matrix(matrix_path)
+    candidate_lists = create_candidate_lists(distance_matrix, granular_k) if granular_k else None
+    Best_Solution, _, _, _ = guided_local_search(instance, distance_matrix, LAMBDA, Penalidade, time_limit, candidate_lists,
+                                                 fast_gls, construction=construction)
+    return float(calculate_solution_cost(Best_Solution, distance_matrix, instance["depot"]))
+
+def format_ranking(ranking):
+    """Ranked table of tune_parameters as text."""
+    lines = [f"{'#':>3} {'LAMBDA':>8} {'Penalidade':>10} {'Rodadas':>7} {'Tempo':>7} {'Gap medio':>10} {'Melhor gap':>10}"]
+    for position, row in enumerate(ranking, 1):
+        lines.append(f"{position:>3} {row['LAMBDA']:>8g} {row['Penalidade']:>10g} {row['rounds']:>7} "
+                     f"{row['time_limit']:>6.1f}s {row['mean_gap']:>10.5f} {row['best_gap']:>10.5f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tuning of LAMBDA and Penalidade by successive halving.")
+    parser.add_argument("instances", nargs="+", help="VRP files, or TXT files listing one VRP file per line")
+    parser.add_argument("--lambda", dest="lambdas", default="0.1,0.2,0.3,0.4,0.5",
+                        help="values of LAMBDA: a list (0.1,0.3) or a range start:stop:step")
+    parser.add_argument("--penalidade", dest="penalidades", default="1", help="values of Penalidade, same format")
+    parser.add_argument("--min-time", type=float, default=2.0)
+    parser.add_argument("--max-time", type=float, default=32.0)
+    parser.add_argument("--eta", type=int, default=2)
+    parser.add_argument("--repetitions", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--granular-k", type=int, default=None)
+    parser.add_argument("--fast-gls", action="store_true")
+    parser.add_argument("--construction", default="random")
+    parser.add_argument("--output", default=None, help="JSON file written with the ranking")
+    args = parser.parse_args()
+
+    paths = []
+    for path in args.instances:
+        paths.extend(read_instance_list(path) if path.lower().endswith(".txt") else [path])
+    ranking = tune_parameters([load_instance(path) for path in paths],
+                              parameter_grid(parse_values(args.lambdas), parse_values(args.penalidades)),
+                              args.min_time, args.max_time, args.eta, args.repetitions, args.workers, args.seed,
+                              args.granular_k, args.fast_gls, args.construction, output_path=args.output)
+    print(format_ranking(ranking))
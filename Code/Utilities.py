@@ -107,6 +107,22 @@ def calculate_vehicle_capacity(route, demands):
         capacity += demands[i - 1]
     return capacity
 
+def calculate_prefix_loads(route, demands):
+    """
+    Computes the cumulative demand served along a vehicle route.
+
+    Parameters:
+    - route (list): A list of node indices representing a vehicle route.
+    - demands (list): A list where demands[i] is the demand of customer i.
+
+    Returns:
+    - list: prefix_loads[k] is the total demand of route[:k] (length len(route) + 1).
+    """
+    prefix_loads = [0]
+    for i in route:
+        prefix_loads.append(prefix_loads[-1] + demands[i - 1])
+    return prefix_loads
+
 def print_matrix(matrix, title="Matrix"):
     """
     Prints a 2D matrix in a readable format.